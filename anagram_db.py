@@ -4,24 +4,126 @@ the stored anagrams is retrieved from the disk and displayed on screen.
 """
 import sys
 import shelve
+import hashlib
 import contextlib
 import argparse
 
 import anagram
+import anagram_server
+import utility
 
 _STORE = 1
 _READ = _STORE * 2
 _STORE_READ = _STORE | _READ
-_COMMANDS = (_STORE, _READ, _STORE_READ)
+_UPDATE = _READ * 2
+_UPDATE_READ = _UPDATE | _READ
+_COMMANDS = (_STORE, _READ, _STORE_READ, _UPDATE, _UPDATE_READ)
+
+# The key of the metadata record. It is not a word sorted in ascending order so it can never be the
+# key of an anagram.
+_META_KEY = '__meta__'
+_DIGEST_MOD = 2 ** 256 # digests are sums of sha256 values modulo 2 ** 256
+_INDEX_EXT = '.idx' # the secondary indexes are stored in a DB file with this extension
+
+class AnagramIndex:
+    """Secondary indexes of the keys of an anagram DB by word length, by the number of anagrams
+    (group size) and by the letters contained in the key.
+
+    Only keys are indexed. As a key is a word sorted in ascending order, the letters of a key are
+    checked without reading its anagrams.
+    """
+    def __init__(self, indexes = None):
+        """ctor
+
+        indexes: tuple(dict, dict, dict) or None, see property 'indexes', None for empty indexes
+        """
+        if indexes is None:
+            indexes = ({}, {}, {})
+
+        self.__lengths = indexes[0] # dict(int, set of str), word length -> keys
+        self.__sizes = indexes[1]   # dict(int, set of str), group size -> keys
+        self.__letters = indexes[2] # dict(str, set of str), letter -> keys that contain the letter
+
+    def add(self, key, agrams):
+        """Add a key to the indexes.
+
+        key   : str, a word sorted in ascending order
+        agrams: list or set, the anagrams of key
+        """
+        self.__lengths.setdefault(len(key), set()).add(key)
+        self.__sizes.setdefault(len(agrams), set()).add(key)
+        for letter in set(key):
+            self.__letters.setdefault(letter, set()).add(key)
+
+    def remove(self, key, agrams):
+        """Remove a key from the indexes.
+
+        key   : str, a word sorted in ascending order
+        agrams: list or set, the anagrams of key when it was added
+        """
+        _discard(self.__lengths, len(key), key)
+        _discard(self.__sizes, len(agrams), key)
+        for letter in set(key):
+            _discard(self.__letters, letter, key)
+
+    def find(self, length = None, size = None, letters = ''):
+        """Find the keys that match all the criteria passed in as parameters.
+
+        length : int or tuple(int or None, int or None) or None, the exact word length or the
+                 inclusive (min, max) range of word lengths, None means any
+        size   : int or tuple(int or None, int or None) or None, the exact number of anagrams or the
+                 inclusive (min, max) range of numbers of anagrams, None means any
+        letters: str, letters that must be contained in a key, a letter that is repeated must be
+                 contained at least as many times
+
+        return: list of str, the sorted keys that match
+
+        exceptions: TypeError, if a parameter has the wrong type
+        """
+        if not isinstance(letters, str):
+            raise TypeError("error: 'letters' has to be of type 'str'")
+
+        # every criterion is a union of index entries, the result is their intersection
+        candidates = [_union(self.__lengths, length, 'length'), _union(self.__sizes, size, 'size')]
+        candidates.extend(self.__letters.get(letter, set()) for letter in set(letters))
+        candidates = [keys for keys in candidates if keys is not None]
+        if not candidates: # no criteria, all keys match
+            candidates.append(set().union(*self.__lengths.values()))
+
+        candidates.sort(key = len) # start from the smallest set
+        keys = candidates[0].intersection(*candidates[1:])
+
+        # the index has one entry per letter so repeated letters are checked on the key itself
+        repeated = {letter: letters.count(letter) for letter in set(letters)
+                    if letters.count(letter) > 1}
+        if repeated:
+            keys = (key for key in keys
+                    if all(key.count(letter) >= count for letter, count in repeated.items()))
+
+        return sorted(keys)
+
+    @property
+    def indexes(self):
+        """Get the indexes as built-in types so that they can be saved without this class.
+
+        return: tuple(dict, dict, dict), the word length, group size and letter indexes
+        """
+        return self.__lengths, self.__sizes, self.__letters
+
+    def __len__(self):
+        """return: int, the number of indexed keys"""
+        return sum(len(keys) for keys in self.__lengths.values())
 
 # inherit from AbstractContextManager to get the default implementation of __enter__()
 # which just returns self
 class AnagramDB(contextlib.AbstractContextManager):
     """Store and read anagrams to and from a DB using the standard Python library shelve."""
-    def __init__(self, filename, command = _READ):
+    def __init__(self, filename, command = _READ, cache_size = utility.LRUCache.MAXSIZE):
         """ctor
 
-        filename: str, the filename to use to store and read anagrams
+        filename  : str, the filename to use to store and read anagrams
+        cache_size: int, the maximum number of anagrams kept in memory by read(), 0 disables the
+                    cache
         """
         if not isinstance(filename, str):
             raise TypeError("error: 'filename' has to be of type 'str'")
@@ -31,11 +133,22 @@ class AnagramDB(contextlib.AbstractContextManager):
             raise ValueError(f"error: 'command' has to be one of {_COMMANDS}")
 
         self.__filename = filename
-        self.__anagram_db = shelve.open(filename, 'c' if command == _READ else 'n')
+        self.__cache = utility.LRUCache(cache_size) # recently read anagrams
+        # only a store truncates the DB file, an update keeps the stored anagrams
+        self.__anagram_db = shelve.open(filename, 'n' if command & _STORE else 'c')
+        self.__digest = None # content digest, read from the metadata record when needed
+
+        # secondary indexes, a truncated DB file starts with empty indexes, otherwise they are
+        # loaded when needed
+        self.__index = AnagramIndex() if command & _STORE else None
+        self.__index_update = bool(command & _STORE) # True if the indexes have to be saved
 
     def read(self, key):
         """Read anagrams from the disk that match a particular key.
 
+        Recently read anagrams are served from memory. The returned object is shared with the cache
+        so it must not be modified.
+
         key: str, a word sorted in ascending order
 
         return: list of str, i.e. the anagrams or None if key does not exist
@@ -46,27 +159,143 @@ class AnagramDB(contextlib.AbstractContextManager):
             raise TypeError("error: 'key' has to be of type 'str'")
 
         try:
-            return self.__anagram_db[key] # return value of key if it exists
+            return self.__read(key) # return value of key if it exists
         except KeyError:
             print(f"key error: {key}")
             return None
 
+    def read_many(self, keys):
+        """Read the anagrams of many keys in one call.
+
+        The keys are read in sorted order so that neighbouring keys are read one after the other
+        from the DB file.
+
+        keys: iterable of str, words sorted in ascending order
+
+        return: dict(str, list of str), the anagrams of every key in the order of keys, the value
+                                        is None if a key does not exist
+
+        exceptions: TypeError, if any key is not str
+        """
+        keys = list(keys)
+        for key in keys:
+            if not isinstance(key, str):
+                raise TypeError(f"error: 'key' = {key!r} has to be of type 'str'")
+
+        agrams = {}
+        for key in sorted(set(keys)):
+            try:
+                agrams[key] = self.__read(key)
+            except KeyError:
+                agrams[key] = None
+
+        return {key: agrams[key] for key in keys}
+
     def store(self, agrams):
         """Store anagrams to the disk using the shelve module.
 
         agrams: key is str, a word sorted in ascending order
                 value is list of str, i.e. the anagrams
         """
+        agram_digest = self.digest
+        index = self.__get_index()
+        self.__index_update = True
+
         # iterate over the dictionary and store each entry
         for sorted_word, agram_list in agrams.items():
+            if sorted_word in self.__anagram_db: # remove the old entry from the digest and indexes
+                old_list = self.__anagram_db[sorted_word]
+                agram_digest -= _entry_digest(sorted_word, old_list)
+                index.remove(sorted_word, old_list)
+            agram_digest += _entry_digest(sorted_word, agram_list)
+            index.add(sorted_word, agram_list)
             self.__anagram_db[sorted_word] = agram_list
+            self.__cache.pop(sorted_word) # the cached anagrams are stale
+
+        self.__set_digest(agram_digest)
+
+    def update(self, agrams):
+        """Update the DB so that it contains exactly the anagrams passed in as a parameter.
+
+        Unlike store() with a truncated DB file, only the keys whose anagrams changed are written
+        and only the keys that no longer exist are deleted.
+
+        agrams: key is str, a word sorted in ascending order
+                value is list of str, i.e. the anagrams
+
+        return: int, the number of keys written or deleted
+        """
+        if self.is_current(agrams): # nothing has changed
+            return 0
+
+        agram_digest = self.digest
+        index = self.__get_index()
+        self.__index_update = True
+        touched = 0
+
+        # delete keys that do not exist anymore
+        for sorted_word in [key for key in self if key not in agrams]:
+            old_list = self.__anagram_db[sorted_word]
+            agram_digest -= _entry_digest(sorted_word, old_list)
+            index.remove(sorted_word, old_list)
+            del self.__anagram_db[sorted_word]
+            self.__cache.pop(sorted_word)
+            touched += 1
+
+        # write keys that are new or whose anagrams changed
+        for sorted_word, agram_list in agrams.items():
+            old_list = self.__anagram_db.get(sorted_word)
+            if old_list != agram_list:
+                if old_list is not None:
+                    agram_digest -= _entry_digest(sorted_word, old_list)
+                    index.remove(sorted_word, old_list)
+                agram_digest += _entry_digest(sorted_word, agram_list)
+                index.add(sorted_word, agram_list)
+                self.__anagram_db[sorted_word] = agram_list
+                self.__cache.pop(sorted_word)
+                touched += 1
+
+        self.__set_digest(agram_digest)
+
+        return touched
 
     def clear(self):
         """Clear anagram DB."""
         self.__anagram_db.clear()
+        self.__cache.clear()
+        self.__set_digest(0)
+        self.__index = AnagramIndex()
+        self.__index_update = True
+
+    def find(self, length = None, size = None, letters = ''):
+        """Find keys by word length, number of anagrams and contained letters using the secondary
+        indexes, i.e. without reading the anagrams of every key.
+
+        See AnagramIndex.find() for the parameters.
+
+        return: list of str, the sorted keys that match
+        """
+        return self.__get_index().find(length, size, letters)
+
+    def is_current(self, agrams):
+        """Check if the DB already contains exactly these anagrams, i.e. no store is needed.
+
+        Only the digest of the DB is read so the DB is not scanned.
+
+        agrams: key is str, a word sorted in ascending order
+                value is list of str, i.e. the anagrams
+
+        return: bool, True if the DB content is equal to agrams
+        """
+        return len(self) == len(agrams) and self.digest == digest(agrams)
 
     def close(self):
-        """Close anagram DB.""" 
+        """Close anagram DB and save the secondary indexes if they have been updated."""
+        if self.__index_update:
+            with shelve.open(self.__filename + _INDEX_EXT, 'n') as index_db:
+                index_db['digest'] = self.digest
+                index_db['index'] = self.__index.indexes
+            self.__index_update = False
         self.__anagram_db.close()
 
     @property
@@ -74,12 +303,34 @@ class AnagramDB(contextlib.AbstractContextManager):
         """return: shelve, instance of anagram db"""
         return self.__anagram_db
 
+    @property
+    def cache_info(self):
+        """return: dict(str, int), hits, misses, evictions, size and maxsize of the read cache"""
+        return self.__cache.info
+
+    @property
+    def digest(self):
+        """Get the content digest, an order independent hash of all key/value pairs.
+
+        The digest is kept in a metadata record that is updated by store(). DB files created
+        before the metadata record existed are scanned once and the digest is saved.
+
+        return: int, the content digest
+        """
+        if self.__digest is None:
+            try:
+                self.__digest = self.__anagram_db[_META_KEY]['digest']
+            except KeyError: # no metadata record yet
+                self.__set_digest(digest({key: self.__anagram_db[key] for key in self}))
+
+        return self.__digest
+
     def __str__(self):
         """Called when printing an anagram DB object.
 
         return: str, a formatted string containing all anagrams
         """
-        return anagram.anagram_str(self.__anagram_db.values())
+        return anagram.anagram_str(self.__anagram_db[key] for key in self)
 
     def __repr__(self):
         """Called when calling the representation (repr(anagram_db_obj)) of an anagram DB object.
@@ -101,7 +352,7 @@ class AnagramDB(contextlib.AbstractContextManager):
 
         return: int, the length of the anagram_db object
         """
-        return len(self.__anagram_db)
+        return len(self.__anagram_db) - (_META_KEY in self.__anagram_db)
 
     def __eq__(self, other):
         """Overloaded '==' operator.
@@ -117,24 +368,15 @@ class AnagramDB(contextlib.AbstractContextManager):
                   f"'{self.__class__.__module__}.{self.__class__.__name__}'")
             return NotImplemented
 
-        if len(self.__anagram_db) == len(other.anagram_db):
-            for word in self.__anagram_db:
-                try:
-                    if self.__anagram_db[word] != other.anagram_db[word]:
-                        return False
-                except KeyError: # key does not exist in other
-                    return False
-        else:
-            return False
-
-        return True
+        # the digests are compared instead of every key/value pair
+        return len(self) == len(other) and self.digest == other.digest
 
     def __iter__(self):
         """Called whenever an iterator of an anagram DB object is requested.
 
         return: iterator object, an anagram_db object iterator
         """
-        return iter(self.__anagram_db)
+        return (key for key in self.__anagram_db if key != _META_KEY)
 
     def __getitem__(self, key):
         """Called when implementing evaluation of self[key].
@@ -147,6 +389,114 @@ class AnagramDB(contextlib.AbstractContextManager):
         """
         return self.read(key)
 
+    def __read(self, key):
+        """Read anagrams from the cache or, if they are not cached, from the disk.
+
+        key: str, a word sorted in ascending order
+
+        return: list of str, i.e. the anagrams
+
+        exceptions: KeyError, if key does not exist
+        """
+        agrams = self.__cache.get(key)
+        if agrams is None:
+            if key == _META_KEY:
+                raise KeyError(key)
+            agrams = self.__anagram_db[key]
+            self.__cache.put(key, agrams)
+
+        return agrams
+
+    def __get_index(self):
+        """Get the secondary indexes, loading them from disk when first needed.
+
+        The indexes are rebuilt from the DB if they don't exist on disk or were saved for a
+        different content of the DB, i.e. with a different digest.
+
+        return: AnagramIndex, the secondary indexes
+        """
+        if self.__index is None:
+            with shelve.open(self.__filename + _INDEX_EXT, 'c') as index_db:
+                if index_db.get('digest') == self.digest:
+                    self.__index = AnagramIndex(index_db['index'])
+
+            if self.__index is None: # rebuild the indexes
+                self.__index = AnagramIndex()
+                for key in self:
+                    self.__index.add(key, self.__anagram_db[key])
+                self.__index_update = True
+
+        return self.__index
+
+    def __set_digest(self, agram_digest):
+        """Save the content digest to the metadata record.
+
+        agram_digest: int, the content digest
+        """
+        self.__digest = agram_digest % _DIGEST_MOD
+        self.__anagram_db[_META_KEY] = {'digest': self.__digest}
+
+def _discard(index, value, key):
+    """Remove a key from an index entry and the entry itself if it becomes empty.
+
+    index: dict(any, set of str), an index
+    value: any, the indexed value
+    key  : str, a word sorted in ascending order
+    """
+    keys = index.get(value)
+    if keys is not None:
+        keys.discard(key)
+        if not keys:
+            del index[value]
+
+def _union(index, value, name):
+    """Get the keys of an index whose indexed value is equal to or within the range of a value.
+
+    index: dict(int, set of str), an index
+    value: int or tuple(int or None, int or None) or None, see AnagramIndex.find()
+    name : str, the parameter name used in error messages
+
+    return: set of str or None, the keys or None if value is None, i.e. any value matches
+
+    exceptions: TypeError, if value has the wrong type
+    """
+    if value is None:
+        return None
+    if isinstance(value, int):
+        return index.get(value, set())
+    if not isinstance(value, tuple) or len(value) != 2:
+        raise TypeError(f"error: '{name}' has to be of type 'int' or 'tuple' of two ints or None")
+
+    low = value[0] if value[0] is not None else min(index, default = 0)
+    high = value[1] if value[1] is not None else max(index, default = 0)
+
+    # there are only a few distinct indexed values so they are all checked
+    return set().union(*(keys for indexed, keys in index.items() if low <= indexed <= high))
+
+def digest(agrams):
+    """Calculate the content digest of anagrams, see AnagramDB.digest.
+
+    agrams: key is str, a word sorted in ascending order
+            value is list of str, i.e. the anagrams
+
+    return: int, the content digest
+    """
+    return sum(_entry_digest(key, value) for key, value in agrams.items()) % _DIGEST_MOD
+
+def _entry_digest(key, value):
+    """Hash a single key/value pair.
+
+    The anagrams are sorted first as sets do not have the same iteration order in every process.
+
+    key  : str, a word sorted in ascending order
+    value: list, set or tuple of str, i.e. the anagrams
+
+    return: int, the sha256 value of the pair
+    """
+    pair = f"{key}\0{sorted(value)!r}".encode('utf-8')
+
+    return int.from_bytes(hashlib.sha256(pair).digest(), 'big')
+
 def main():
     """Main entry point.
 
@@ -156,24 +506,35 @@ def main():
 
     # get command type
     if 'type' in args:
+        command = _UPDATE if args.update else _STORE
         if 'key' in args:
-            command = _STORE_READ
-        else:
-            command = _STORE
+            command |= _READ
 
         agram_type = args.type # get anagram type
     else:
         command = _READ
 
+    if 'port' in args: # keep the DB open and answer queries until interrupted
+        with AnagramDB(args.db, command, args.cache) as anagram_db:
+            anagram_server.AnagramServer(anagram_db).serve(args.socket, args.host, args.port)
+        return 0
+
     with AnagramDB(args.db, command) as anagram_db:
         # create anagrams and store them to disk
-        if command in (_STORE, _STORE_READ):
+        if command & (_STORE | _UPDATE):
             agram = anagram.Anagram()
             if agram.create(*args.input, flag = agram_type):
-                anagram_db.store(agram()[1])
-
-        if command != _STORE: # read anagrams based on key
-            print(anagram_db(args.key))
+                if command & _UPDATE: # write only the changes
+                    print(f"keys touched: {anagram_db.update(agram()[1])}")
+                else:
+                    anagram_db.store(agram()[1])
+
+        if command & _READ:
+            if 'letters' in args: # read anagrams based on the secondary indexes
+                keys = anagram_db.find(args.length, args.size, args.letters)
+                print(anagram.anagram_str(anagram_db.read_many(keys).values()), end = '')
+            else: # read anagrams based on key
+                print(anagram_db(args.key))
 
     return 0
 
@@ -216,6 +577,9 @@ def _cmdline():
     parser_s.add_argument('-t', '--type', type = int, choices = [1, 2, 4], default = 1,
                           help = anagram._HELP_ANAGRAM_TYPE)
     parser_s.add_argument('-i', '--input', nargs='+', required = True, help = anagram._HELP_INPUT)
+    parser_s.add_argument('-u', '--update', action = 'store_true',
+                          help = 'update an existing DB file by writing only the anagrams that '
+                                 'changed\nand deleting the ones that no longer exist')
 
     # create the parser for the "read" command
     subparsers.add_parser('read', aliases = ['r'], parents = [parser_db, parser_key],
@@ -229,7 +593,43 @@ def _cmdline():
                           formatter_class = argparse.RawTextHelpFormatter,
                           help = 'store first and then read (combination of the commands above)')
 
-    return parser.parse_args()
+    # create the parser for the "find" command
+    parser_f = subparsers.add_parser('find', aliases = ['f'], parents = [parser_db],
+                                     formatter_class = argparse.RawTextHelpFormatter,
+                                     help = 'read all anagrams whose key matches the word length,\n'
+                                            'number of anagrams and letters given')
+    parser_f.add_argument('-l', '--length', nargs = '+', type = int, metavar = ('MIN', 'MAX'),
+                          help = 'the word length or the inclusive range of word lengths')
+    parser_f.add_argument('-s', '--size', nargs = '+', type = int, metavar = ('MIN', 'MAX'),
+                          help = 'the number of anagrams or the inclusive range of numbers')
+    parser_f.add_argument('-c', '--letters', default = '',
+                          help = 'the letters that the words must contain')
+
+    # create the parser for the "serve" command
+    parser_v = subparsers.add_parser('serve', aliases = ['v'], parents = [parser_db],
+                                     formatter_class = argparse.RawTextHelpFormatter,
+                                     help = 'keep a DB file open and answer newline delimited JSON\n'
+                                            'queries over a Unix socket or a localhost TCP socket')
+    parser_v.add_argument('-s', '--socket',
+                          help = 'the Unix socket filename, if omitted a TCP socket is used')
+    parser_v.add_argument('--host', default = anagram_server.HOST,
+                          help = f"the TCP host (default: {anagram_server.HOST})")
+    parser_v.add_argument('-p', '--port', type = int, default = anagram_server.PORT,
+                          help = f"the TCP port (default: {anagram_server.PORT})")
+    parser_v.add_argument('-c', '--cache', type = int, default = utility.LRUCache.MAXSIZE,
+                          help = 'the maximum number of anagrams kept in memory '
+                                 f"(default: {utility.LRUCache.MAXSIZE})")
+
+    args = parser.parse_args()
+    if 'letters' in args: # convert ranges to the types expected by AnagramDB.find()
+        for name in ('length', 'size'):
+            value = getattr(args, name)
+            if value is not None:
+                if len(value) > 2:
+                    parser_f.error(f"argument --{name}: expected one or two values")
+                setattr(args, name, value[0] if len(value) == 1 else tuple(value))
+
+    return args
 
 if __name__ == '__main__':
     sys.exit(main())
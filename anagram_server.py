@@ -0,0 +1,218 @@
+"""This module implements a local query server for an anagram DB. The DB is opened once and queries
+are answered over a Unix socket or a localhost TCP socket, so that scripts do not have to start a
+new process and open the DB for every lookup.
+
+The protocol is newline delimited JSON. Every request is a JSON object on a single line and every
+response is a JSON object on a single line. A line may also contain a JSON array of requests which
+is answered with a JSON array of responses (batching). Requests:
+
+    {"op": "read", "key": "aer"}
+    {"op": "read_many", "keys": ["aer", "no"]}
+    {"op": "find", "length": [5, 7], "size": 3, "letters": "ae"}
+    {"op": "stats"}
+
+An optional "id" member of a request is returned in its response. A response is either
+{"ok": true, "result": ...} or {"ok": false, "error": "..."}. A request line has at most LINE_LIMIT
+bytes, a longer line is skipped and answered with an error.
+"""
+import json
+import asyncio
+
+HOST = '127.0.0.1'
+PORT = 8765
+LINE_LIMIT = 1 << 24 # max number of bytes of a request line, 16 MiB
+
+class AnagramServer:
+    """Answer anagram queries of many clients using a single open anagram DB."""
+    def __init__(self, anagram_db):
+        """ctor
+
+        anagram_db: anagram_db.AnagramDB, an open anagram DB
+        """
+        self.__anagram_db = anagram_db
+        self.__requests = 0    # number of requests answered
+        self.__batches = 0     # number of lines that contained a batch of requests
+        self.__connections = 0 # number of currently open connections
+        self.__ops = {'read': self.__read,
+                      'read_many': self.__read_many,
+                      'find': self.__find,
+                      'stats': self.__stats}
+
+    async def start(self, path = None, host = HOST, port = PORT):
+        """Start listening for connections.
+
+        path: str or None, the Unix socket filename, if None a TCP socket is used
+        host: str, the TCP host
+        port: int, the TCP port, 0 picks a free port
+
+        return: asyncio.Server, the listening server
+        """
+        if path is not None:
+            return await asyncio.start_unix_server(self.__handle, path, limit = LINE_LIMIT)
+
+        return await asyncio.start_server(self.__handle, host, port, limit = LINE_LIMIT)
+
+    def serve(self, path = None, host = HOST, port = PORT):
+        """Serve until interrupted, e.g. by Ctrl+C.
+
+        See start() for the parameters.
+        """
+        async def serve_forever():
+            server = await self.start(path, host, port)
+            sockets = ', '.join(str(sock.getsockname()) for sock in server.sockets)
+            print(f"serving {self.__anagram_db!r} on {sockets}", flush = True)
+            async with server:
+                await server.serve_forever()
+
+        try:
+            asyncio.run(serve_forever())
+        except KeyboardInterrupt:
+            pass
+
+    def respond(self, line):
+        """Answer the requests of a single line.
+
+        line: str or bytes, a JSON request or a JSON array of requests
+
+        return: str, the JSON response or JSON array of responses, without a newline
+        """
+        try:
+            request = json.loads(line)
+        except ValueError as exc:
+            return json.dumps(_error(f"invalid JSON: {exc}"))
+
+        if isinstance(request, list):
+            self.__batches += 1
+            return json.dumps([self.__respond(req) for req in request])
+
+        return json.dumps(self.__respond(request))
+
+    @property
+    def stats(self):
+        """return: dict, the server and read cache counters"""
+        return self.__stats({})
+
+    async def __handle(self, reader, writer):
+        """Answer the requests of a single connection until the client closes it.
+
+        reader: asyncio.StreamReader
+        writer: asyncio.StreamWriter
+        """
+        self.__connections += 1
+        try:
+            while (line := await _readline(reader)) != b'':
+                if line is None:
+                    response = json.dumps(_error(f"a line must not exceed {LINE_LIMIT} bytes"))
+                elif line.strip():
+                    response = self.respond(line)
+                else:
+                    continue
+                writer.write(response.encode('utf-8') + b'\n')
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            self.__connections -= 1
+            writer.close()
+
+    def __respond(self, request):
+        """Answer a single request.
+
+        request: any, a decoded JSON request
+
+        return: dict, the response
+        """
+        self.__requests += 1
+        if not isinstance(request, dict):
+            return _error("a request has to be a JSON object")
+
+        operation = request.get('op')
+        operation = self.__ops.get(operation) if isinstance(operation, str) else None
+        if operation is None:
+            response = _error(f"'op' has to be one of {list(self.__ops)}")
+        else:
+            try:
+                response = {'ok': True, 'result': operation(request)}
+            except (TypeError, ValueError, KeyError) as exc:
+                response = _error(str(exc))
+
+        if 'id' in request:
+            response['id'] = request['id']
+
+        return response
+
+    def __read(self, request):
+        """return: list of str or None, the anagrams of request['key']"""
+        key = request['key']
+        if not isinstance(key, str):
+            raise TypeError("error: 'key' has to be of type 'str'")
+
+        return _anagrams(self.__anagram_db.read_many((key,))[key])
+
+    def __read_many(self, request):
+        """return: dict(str, list of str or None), the anagrams of every key of request['keys']"""
+        keys = request['keys']
+        if not isinstance(keys, list):
+            raise TypeError("error: 'keys' has to be a list of 'str'")
+
+        return {key: _anagrams(agrams)
+                for key, agrams in self.__anagram_db.read_many(keys).items()}
+
+    def __find(self, request):
+        """return: list of str, the keys that match the criteria of the request"""
+        return self.__anagram_db.find(_criterion(request.get('length')),
+                                      _criterion(request.get('size')),
+                                      request.get('letters', ''))
+
+    def __stats(self, request):
+        """return: dict, the server and read cache counters"""
+        return {'requests': self.__requests,
+                'batches': self.__batches,
+                'connections': self.__connections,
+                'keys': len(self.__anagram_db),
+                'cache': self.__anagram_db.cache_info}
+
+def _anagrams(agrams):
+    """Convert anagrams to a JSON serializable value.
+
+    agrams: set of str or set of tuple(str, str) or None
+
+    return: list or None, the sorted anagrams
+    """
+    return None if agrams is None else sorted(agrams)
+
+def _criterion(value):
+    """Convert a JSON range [min, max] to the tuple expected by AnagramDB.find().
+
+    value: int, list or None
+
+    return: int, tuple or None
+    """
+    return tuple(value) if isinstance(value, list) else value
+
+async def _readline(reader):
+    """Read a line, skipping the rest of a line that exceeds the limit of the reader.
+
+    Unlike StreamReader.readline(), which raises ValueError and may leave the rest of a long line in
+    the stream, the stream is left at the start of the next line.
+
+    reader: asyncio.StreamReader
+
+    return: bytes or None, the line, b'' at the end of the stream or None if the line was too long
+    """
+    overrun = False
+    while True:
+        try:
+            line = await reader.readuntil(b'\n')
+        except asyncio.IncompleteReadError as exc: # end of the stream
+            line = exc.partial
+        except asyncio.LimitOverrunError as exc:
+            overrun = True
+            await reader.readexactly(exc.consumed)
+            continue
+
+        return None if overrun else line
+
+def _error(desc):
+    """return: dict, an error response"""
+    return {'ok': False, 'error': desc}
@@ -9,7 +9,6 @@ incremented. Thus, the probability that a birthday occurs a certain number of ti
 (total number of matches / iterations).
 """
 import sys
-import random
 import argparse
 
 import utility
@@ -43,7 +42,8 @@ class Birthday(utility.AdderWithRefCount):
                  begin_year = BEGIN_YEAR,
                  end_year = END_YEAR,
                  occur = OCCUR,
-                 append = False):
+                 append = False,
+                 rng = None):
         """Calculate the probability that a birthday occurs certain times within a sample.
 
         'samples' is the maximun number of birthdays generated in a single iteration. To get
@@ -61,15 +61,18 @@ class Birthday(utility.AdderWithRefCount):
         end_year  : int, the gererated random years should not be later than this year
         occur     : int, the number of times a single birthday should occur within a sample
         append    : bool, if True append to current matches else just generate new ones
+        rng       : random.Random or None, the random number generator, e.g. a
+                    utility.RandomStream for reproducible runs, None uses the global random state
         """
         _param_error(iterations, samples, begin_year, end_year, occur, append)
+        randint = utility.random_stream(rng).randint
 
         self.__reset(iterations, samples, begin_year, end_year, occur, append)
 
         for i in range(iterations):
             # Generate a maximum number of birthdays equal to 'samples'. If the number of birthdays
             # that are the same is equal to 'occur' then a match (the number one) is returned.
-            self.__hits += self.__generate()
+            self.__hits += self.__generate(randint)
 
     @property
     def matches(self):
@@ -221,7 +224,7 @@ class Birthday(utility.AdderWithRefCount):
         if not append:
             self.__hits = 0
 
-    def __generate(self):
+    def __generate(self, randint):
         """Generate birthday samples.
 
         Generate birthday samples until a sample appears a certain number of times or the maximum
@@ -230,21 +233,23 @@ class Birthday(utility.AdderWithRefCount):
         A birthday is a tuple in the form (year, month, day) where 'year', 'month' and 'day' are
         ints.
 
+        randint: callable, the randint() method of the random number generator to use
+
         return: int, 1 if a single birthday has occured a number of times, 0 otherwise
         """
         bdays = set()
         occur = self.__occur
         for i in range(self.__samples):
-            year = random.randint(self.__begin_year, self.__end_year)
-            month = random.randint(1, 12)
+            year = randint(self.__begin_year, self.__end_year)
+            month = randint(1, 12)
             if month in (1, 3, 5, 7, 8, 10, 12):
-                day = random.randint(1, 31) # day up to 31 days
+                day = randint(1, 31) # day up to 31 days
             elif month in (4, 6, 9, 11):
-                day = random.randint(1, 30) # day up to 30 days
+                day = randint(1, 30) # day up to 30 days
             elif _leap_year(year):
-                day = random.randint(1, 29) # february and leap, day up to 29 days
+                day = randint(1, 29) # february and leap, day up to 29 days
             else:
-                day = random.randint(1, 28) # february and not leap, day up to 28 days
+                day = randint(1, 28) # february and not leap, day up to 28 days
 
             bday = (year, month, day)
             if bday in bdays:
@@ -288,10 +293,13 @@ def main():
                         default = 2,
                         help = "the number of times a birthday should be repeated in the samples"
                                " of an iteration, must be < samples (default: 2)")
+    parser.add_argument('--seed', type = int,
+                        help = "the master seed for reproducible runs (default: random)")
     args  = parser.parse_args()
 
     birthday = Birthday()
-    birthday.generate(args.iterations, args.samples, args.begin_year, args.end_year, args.occur)
+    birthday.generate(args.iterations, args.samples, args.begin_year, args.end_year, args.occur,
+                      rng = None if args.seed is None else utility.RandomStream(args.seed))
     print(birthday)
 
     return 0
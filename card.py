@@ -10,23 +10,59 @@ from __future__ import print_function, division
 
 import random
 
+try:
+    import numpy
+except ImportError: # numpy is optional, shuffle_batch() falls back to pure Python
+    numpy = None
+
 
 class Card:
     """Represents a standard playing card.
 
+    There is exactly one instance per card (flyweight), so Card(suit, rank) returns one of the 52
+    instances in CARDS and cards are immutable. Comparisons and hashing use the integer code.
+
     Attributes:
       suit: integer 0-3
       rank: integer 1-13
+      code: integer 0-51, suit * 13 + rank - 1, so codes are ordered like cards
     """
+    __slots__ = ('suit', 'rank', 'code')
 
     suit_names = ["Clubs", "Diamonds", "Hearts", "Spades"]
     rank_names = [None, "Ace", "2", "3", "4", "5", "6", "7",
               "8", "9", "10", "Jack", "Queen", "King"]
     QUALIFIER = " of "
+    NUM_RANKS = 13
+
+    def __new__(cls, suit=0, rank=2):
+        """Returns the instance of a card.
+
+        exceptions: ValueError, if suit is not within [0, 3] or rank within [1, 13]
+        """
+        if suit in range(len(Card.suit_names)) and rank in range(1, Card.NUM_RANKS + 1):
+            return CARDS[suit * Card.NUM_RANKS + rank - 1]
+        raise ValueError(f"error: invalid card, suit = {suit!r}, rank = {rank!r}")
+
+    @staticmethod
+    def from_code(code):
+        """Returns the instance of a card from its integer code.
+
+        code: integer 0-51
+        """
+        return CARDS[code]
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"'{self.__class__.__name__}' objects are immutable")
 
-    def __init__(self, suit=0, rank=2):
-        self.suit = suit
-        self.rank = rank
+    def __reduce__(self):
+        return self.__class__, (self.suit, self.rank)
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
 
     def __str__(self):
         """Returns a human-readable string representation."""
@@ -39,15 +75,93 @@ class Card:
         """Checks whether self and other have the same rank and suit.
         returns: boolean
         """
-        return self.suit == other.suit and self.rank == other.rank
+        if not isinstance(other, Card):
+            return NotImplemented
+        return self.code == other.code
+
+    def __hash__(self):
+        return self.code
 
     def __lt__(self, other):
         """Compares this card to other, first by suit, then rank.
         returns: boolean
         """
-        t1 = self.suit, self.rank
-        t2 = other.suit, other.rank
-        return t1 < t2
+        if not isinstance(other, Card):
+            return NotImplemented
+        return self.code < other.code
+
+
+def _make_cards():
+    """Creates the 52 card instances ordered by code."""
+    cards = []
+    for code in range(len(Card.suit_names) * Card.NUM_RANKS):
+        card = object.__new__(Card)
+        suit, rank = divmod(code, Card.NUM_RANKS)
+        object.__setattr__(card, 'suit', suit)
+        object.__setattr__(card, 'rank', rank + 1)
+        object.__setattr__(card, 'code', code)
+        cards.append(card)
+    return tuple(cards)
+
+# the card instances indexed by their integer code
+CARDS = _make_cards()
+
+# short notation of the ranks 1-13 and of the suits 0-3, e.g. 'As' is the Ace of Spades
+RANK_LETTERS = "A23456789TJQK"
+SUIT_LETTERS = "cdhs"
+
+
+def _make_tokens():
+    """Creates the table of short notations, in upper or lower case and
+    with '10' for 'T', to card codes."""
+    tokens = {}
+    for code in range(len(CARDS)):
+        suit, rank = divmod(code, Card.NUM_RANKS)
+        suit_letter = SUIT_LETTERS[suit]
+        rank_letters = [RANK_LETTERS[rank], RANK_LETTERS[rank].lower()]
+        if RANK_LETTERS[rank] == 'T':
+            rank_letters.append('10')
+        for rank_letter in rank_letters:
+            tokens[rank_letter + suit_letter] = code
+            tokens[rank_letter + suit_letter.upper()] = code
+    return tokens
+
+# short notation of a card -> card code
+TOKENS = _make_tokens()
+
+
+def parse_codes(text):
+    """Parses cards in short notation, e.g. 'As Kd' or 'AsKd', into card codes.
+
+    text: string of tokens separated by whitespace or commas, a token may
+          also be several cards written without separator
+
+    returns: list of integer card codes
+    exceptions: ValueError, if a token is not a card
+    """
+    codes = []
+    for word in text.replace(',', ' ').split():
+        code = TOKENS.get(word)
+        if code is not None:
+            codes.append(code)
+            continue
+        if len(word) % 2:
+            raise ValueError(f"error: invalid card(s) {word!r}")
+        for i in range(0, len(word), 2):
+            code = TOKENS.get(word[i:i+2])
+            if code is None:
+                raise ValueError(f"error: invalid card {word[i:i+2]!r} in {word!r}")
+            codes.append(code)
+    return codes
+
+
+def format_codes(codes):
+    """Returns the short notation of card codes separated by spaces.
+
+    codes: sequence of integer card codes
+    """
+    return ' '.join(RANK_LETTERS[code % Card.NUM_RANKS] + SUIT_LETTERS[code // Card.NUM_RANKS]
+                    for code in codes)
 
 class Deck:
     """Represents a deck of cards.
@@ -58,11 +172,7 @@ class Deck:
     def __init__(self):
         """Initializes the Deck with 52 cards.
         """
-        self.cards = []
-        for suit in range(4):
-            for rank in range(1, 14):
-                card = Card(suit, rank)
-                self.cards.append(card)
+        self.cards = list(CARDS)
 
     def __str__(self):
         """Returns a string representation of the deck.
@@ -92,9 +202,12 @@ class Deck:
         """
         return self.cards.pop(i)
 
-    def shuffle(self):
-        """Shuffles the cards in this deck."""
-        random.shuffle(self.cards)
+    def shuffle(self, rng=None):
+        """Shuffles the cards in this deck.
+
+        rng: random.Random or None to use the global random state
+        """
+        (rng or random).shuffle(self.cards)
 
     def sort(self):
         """Sorts the cards in ascending order."""
@@ -108,6 +221,69 @@ class Deck:
         for i in range(num):
             hnd.add_card(self.pop_card())
 
+class ArrayDeck:
+    """Represents a deck of cards as an array of card codes.
+
+    Cards are dealt from a cursor, so the deck is reset by rewinding the cursor
+    instead of rebuilding the cards.
+
+    Attributes:
+      codes: bytearray of 52 card codes, see Card.code
+      cursor: integer index of the next card to deal
+    """
+
+    def __init__(self):
+        """Initializes the deck with 52 card codes in ascending order.
+        """
+        self.codes = bytearray(range(len(CARDS)))
+        self.cursor = 0
+
+    def __str__(self):
+        """Returns a string representation of the cards left in the deck.
+        """
+        return '\n'.join(str(CARDS[code]) for code in self.codes[self.cursor:])
+
+    def __len__(self):
+        """Returns the number of cards left in the deck."""
+        return len(self.codes) - self.cursor
+
+    def reset(self):
+        """Puts all dealt cards back by rewinding the cursor."""
+        self.cursor = 0
+
+    def shuffle(self, rng=None):
+        """Puts all dealt cards back and shuffles the deck.
+
+        rng: random.Random or None to use the global random state
+        """
+        (rng or random).shuffle(self.codes)
+        self.cursor = 0
+
+    def deal(self, num_hands, num_cards):
+        """Deals hands of card codes as contiguous slices of the deck.
+
+        num_hands: integer number of hands
+        num_cards: integer number of cards per hand
+
+        returns: list of bytes, the card codes of every hand
+        """
+        end = self.cursor + num_hands * num_cards
+        if end > len(self.codes):
+            raise ValueError(f"error: {num_hands} hands of {num_cards} cards need "
+                             f"{num_hands * num_cards} cards, {len(self)} are left")
+
+        codes = bytes(self.codes[self.cursor:end])
+        self.cursor = end
+        return [codes[i:i+num_cards] for i in range(0, len(codes), num_cards)]
+
+    def move_cards(self, hnd, num):
+        """Moves the given number of cards from the deck into the Hand in one call.
+        hnd: destination Hand object
+        num: integer number of cards to move
+        """
+        hnd.cards.extend(map(CARDS.__getitem__, self.deal(1, num)[0]))
+
+
 class Hand(Deck):
     """Represents a hand of playing cards."""
 
@@ -116,6 +292,34 @@ class Hand(Deck):
         self.label = label
 
 
+def shuffle_batch(num_decks, rng=None):
+    """Shuffles many decks of card codes in one call.
+
+    With NumPy every row of a matrix of card codes is permuted in one
+    vectorized call; the NumPy generator is seeded from rng so the result
+    is reproducible. Without NumPy every deck is a bytearray shuffled with
+    rng.shuffle.
+
+    num_decks: integer number of decks
+    rng: random.Random or None to use the global random state
+
+    returns: numpy.ndarray of uint8 with shape (num_decks, 52) or,
+             without NumPy, list of bytearray
+    """
+    rng = rng or random
+    if numpy is not None:
+        generator = numpy.random.default_rng(rng.getrandbits(128))
+        decks = numpy.tile(numpy.arange(len(CARDS), dtype=numpy.uint8), (num_decks, 1))
+        return generator.permuted(decks, axis=1)
+
+    decks = []
+    for i in range(num_decks):
+        deck = bytearray(range(len(CARDS)))
+        rng.shuffle(deck)
+        decks.append(deck)
+    return decks
+
+
 def find_defining_class(obj, method_name):
     """Finds and returns the class object that will provide 
     the definition of method_name (as a string) if it is
@@ -8,7 +8,6 @@ suffix. Thus, each prefix has a list of suffixes.
 """
 import sys
 import string
-import random
 import fileinput
 import copy
 import argparse
@@ -82,11 +81,13 @@ class RandomText(utility.AdderWithRefCount):
 
         return True
 
-    def sample(self, samples):
+    def sample(self, samples, rng = None):
         """Return a list of random prefix-suffix pairs from the random text dictionary.
 
         samples: int > 0, number of random samples to read from the dictionary of
                  prefix-suffix pairs
+        rng    : random.Random or None, the random number generator, e.g. a
+                 utility.RandomStream for reproducible samples, None uses the global random state
 
         return: list, the randomly retrieved samples
         """
@@ -96,6 +97,8 @@ class RandomText(utility.AdderWithRefCount):
             print("error: 'samples' has to be of type 'int' > 0")
             return rand_samples
 
+        choice = utility.random_stream(rng).choice
+
         # if no param error proceed
         if self.__random_text:
             # convert random text dictionary to a list as the 'choice' function of the random
@@ -103,11 +106,11 @@ class RandomText(utility.AdderWithRefCount):
             rand_text = list(self.__random_text.items())
             for i in range(samples):
                 # choose a random prefix-suffix pair from the list
-                rand_sample = random.choice(rand_text)
+                rand_sample = choice(rand_text)
                 rand_samples.append(rand_sample[0]) # the prefix
 
                 # choose a random suffix from the list of suffixes
-                rand_samples.append(random.choice(rand_sample[1]))
+                rand_samples.append(choice(rand_sample[1]))
 
         return rand_samples
 
@@ -159,9 +162,9 @@ class RandomText(utility.AdderWithRefCount):
 
         return random_text
 
-    def __call__(self, samples):
+    def __call__(self, samples, rng = None):
         """See doc of returned method."""
-        return self.sample(samples)
+        return self.sample(samples, rng)
 
     def __bool__(self):
         """Called when a random text object is used as a boolean in an expression.
@@ -306,14 +309,17 @@ def main():
                                "valid values: 1 (strip), 0 (don't strip) (default: 1)")
     parser.add_argument('-f', '--files', nargs='+', required = True,
                         help = "the text file(s) to read")
+    parser.add_argument('--seed', type = int,
+                        help = "the master seed for reproducible samples (default: random)")
     args  = parser.parse_args()
 
     rand_text = RandomText()
+    rng = None if args.seed is None else utility.RandomStream(args.seed)
 
     # check integer command line parameters
     if args.samples > 0:
         if rand_text.create(args.length, *args.files, strip = bool(args.strip), reset = True):
-            print(rand_text(args.samples))
+            print(rand_text(args.samples, rng))
     else:
         rand_text(args.samples)
 
@@ -0,0 +1,295 @@
+"""This module calculates the equity of Texas hold'em hands: given the hole cards of 2 to 9 players
+and 0 to 5 board cards, the probability of every player to win, tie or lose at showdown. A board
+that is tied by k players adds 1/k to the equity of each of them.
+
+If there are at most MAX_EXACT remaining boards, e.g. from the flop on, every board is enumerated and
+the result is exact. Otherwise boards are sampled (Monte Carlo) in rounds of ROUND_BOARDS boards
+until the standard error of the equity of every player is at most the target standard error. The
+samples come from child streams of a utility.RandomStream, one per chunk of CHUNK_BOARDS boards, so
+a seeded run gives the same result for any number of worker processes.
+
+The chunks are evaluated in a process pool. Per board, the prime product and the suit masks of the
+board cards are computed once and combined with the hole cards of every player, see
+poker_eval.evaluate_shared().
+"""
+import os
+import sys
+import math
+import argparse
+import itertools
+import concurrent.futures
+
+try:
+    import numpy
+except ImportError: # numpy is optional, the boards are then sampled and counted in pure Python
+    numpy = None
+
+import card
+import utility
+import poker_eval
+
+MIN_PLAYERS = 2
+MAX_PLAYERS = 9
+HOLE_CARDS = 2 # number of hole cards per player
+BOARD_CARDS = 5 # number of board cards at showdown
+
+MAX_EXACT = 200_000 # max number of remaining boards that are enumerated
+STDERR = 0.002 # target standard error of the equity of every player with Monte Carlo
+MAX_SAMPLES = 10_000_000 # max number of sampled boards with Monte Carlo
+CHUNK_BOARDS = 5_000 # number of boards per chunk of work of a worker process
+ROUND_BOARDS = 4 * CHUNK_BOARDS # number of sampled boards between checks of the standard error
+
+def equity(holes, board = (), dead = (), stderr = STDERR, max_exact = MAX_EXACT, workers = None,
+           rng = None):
+    """Calculate the equity of Texas hold'em hands.
+
+    holes    : sequence of sequence of int, the 2 hole card codes of every player, 2 to 9 players
+    board    : sequence of int, 0 to 5 board card codes
+    dead     : sequence of int, card codes that are out of the deck, e.g. folded hands
+    stderr   : float, the target standard error of the equity of every player with Monte Carlo
+    max_exact: int, the max number of remaining boards that are enumerated
+    workers  : int or None, the number of worker processes, None for the number of CPUs, 1 runs in
+               this process
+    rng      : random.Random or None, the random number generator that seeds the sampled chunks,
+               e.g. a utility.RandomStream for reproducible runs
+
+    return: dict, the result
+              'boards' : int, the number of evaluated boards
+              'exact'  : bool, True if every remaining board was evaluated
+              'players': list of dict, per player the probabilities 'win', 'tie' and 'loss',
+                         the 'equity' and its standard error 'stderr' (0 if exact)
+
+    exceptions: ValueError, if a parameter is not valid
+    """
+    holes, board, dead = _param_error(holes, board, dead, stderr, max_exact, workers)
+    used = set(board + dead).union(*holes)
+    deck = tuple(code for code in range(len(card.CARDS)) if code not in used)
+    num_draw = BOARD_CARDS - len(board)
+    if len(deck) < num_draw:
+        raise ValueError(f"error: {len(deck)} cards are left, the board needs {num_draw}")
+
+    poker_eval.load_tables() # once, instead of in every worker process
+    workers = workers or os.cpu_count() or 1
+    total = [0] * len(holes), [0] * len(holes), [0.0] * len(holes), [0.0] * len(holes)
+    num_boards = math.comb(len(deck), num_draw)
+    exact = num_boards <= max_exact
+
+    with _Pool(workers) as pool:
+        if exact:
+            draws = itertools.combinations(deck, num_draw)
+            chunks = [(holes, board, list(itertools.islice(draws, CHUNK_BOARDS)), None)
+                      for start in range(0, num_boards, CHUNK_BOARDS)]
+            for counts in pool.map(_chunk, chunks):
+                _merge(total, counts)
+        else:
+            seeds = utility.RandomStream(utility.random_stream(rng).getrandbits(128))
+            num_boards = 0
+            while num_boards < MAX_SAMPLES:
+                chunks = [(holes, board, (deck, num_draw, CHUNK_BOARDS), stream)
+                          for stream in seeds.spawn(ROUND_BOARDS // CHUNK_BOARDS)]
+                for counts in pool.map(_chunk, chunks):
+                    _merge(total, counts)
+                num_boards += ROUND_BOARDS
+                if max(_stderr(shares, squares, num_boards)
+                       for shares, squares in zip(total[2], total[3])) <= stderr:
+                    break
+
+    players = []
+    for wins, ties, shares, squares in zip(*total):
+        players.append({'win': wins / num_boards,
+                        'tie': ties / num_boards,
+                        'loss': (num_boards - wins - ties) / num_boards,
+                        'equity': shares / num_boards,
+                        'stderr': 0.0 if exact else _stderr(shares, squares, num_boards)})
+
+    return {'boards': num_boards, 'exact': exact, 'players': players}
+
+class _Pool:
+    """A process pool whose map() keeps the order of the results, or this process for 1 worker."""
+    def __init__(self, workers):
+        """ctor
+
+        workers: int, the number of worker processes
+        """
+        self.__executor = concurrent.futures.ProcessPoolExecutor(workers) if workers > 1 else None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        if self.__executor is not None:
+            self.__executor.shutdown()
+
+    def map(self, func, args):
+        """Call func for every tuple of arguments.
+
+        func: callable, a module level function
+        args: list of tuple, the arguments of every call
+
+        return: iterator, the results in the order of args
+        """
+        if self.__executor is None or len(args) < 2:
+            return itertools.starmap(func, args)
+
+        return self.__executor.map(func, *zip(*args))
+
+def _chunk(holes, board, draws, rng):
+    """Evaluate a chunk of boards, called in a worker process.
+
+    holes: list of tuple of int, the hole card codes of every player
+    board: tuple of int, the known board card codes
+    draws: list of tuple of int, the card codes added to the board if rng is None, otherwise
+           tuple(tuple of int, int, int), the remaining card codes, the number of cards to draw
+           from them per board and the number of boards to sample
+    rng  : random.Random or None, the random number generator to sample boards
+
+    return: tuple of list, per player the number of wins and ties, the sum of the shares of the
+            boards (1 / number of winners) and the sum of their squares
+    """
+    if rng is None:
+        num_draw, num = BOARD_CARDS - len(board), len(draws)
+    else:
+        deck, num_draw, num = draws
+        if numpy is not None:
+            generator = numpy.random.default_rng(rng.getrandbits(128))
+            draws = generator.permuted(numpy.tile(numpy.array(deck), (num, 1)),
+                                       axis = 1)[:, :num_draw]
+        else:
+            draws = [rng.sample(deck, num_draw) for i in range(num)]
+
+    if numpy is None:
+        return _count(poker_eval.evaluate_shared([board + tuple(draw) for draw in draws], holes))
+
+    boards = numpy.hstack((numpy.tile(numpy.array(board, dtype = numpy.intp), (num, 1)),
+                           numpy.array(draws, dtype = numpy.intp).reshape(num, num_draw)))
+    strengths = poker_eval.evaluate_shared(boards, holes)
+
+    winners = strengths == strengths.max(axis = 0)
+    num_winners = winners.sum(axis = 0)
+    shares = winners / num_winners
+
+    return ((winners & (num_winners == 1)).sum(axis = 1).tolist(),
+            (winners & (num_winners > 1)).sum(axis = 1).tolist(),
+            shares.sum(axis = 1).tolist(),
+            (shares * shares).sum(axis = 1).tolist())
+
+def _count(strengths):
+    """Count the wins and ties of every player without NumPy, see _chunk().
+
+    strengths: list of list of int, the strength of the hand of every player per board
+
+    return: tuple of list, see _chunk()
+    """
+    wins, ties = [0] * len(strengths), [0] * len(strengths)
+    shares, squares = [0.0] * len(strengths), [0.0] * len(strengths)
+    for row in zip(*strengths):
+        best = max(row)
+        winners = [player for player, strength in enumerate(row) if strength == best]
+        share = 1 / len(winners)
+        for player in winners:
+            if len(winners) == 1:
+                wins[player] += 1
+            else:
+                ties[player] += 1
+            shares[player] += share
+            squares[player] += share * share
+
+    return wins, ties, shares, squares
+
+def _merge(total, counts):
+    """Add the counts of a chunk to the total counts.
+
+    total : tuple of list, the total counts, see _chunk()
+    counts: tuple of list, the counts of a chunk
+    """
+    for total_values, values in zip(total, counts):
+        for player, value in enumerate(values):
+            total_values[player] += value
+
+def _stderr(shares, squares, num):
+    """Calculate the standard error of the mean share.
+
+    shares : float, the sum of the shares
+    squares: float, the sum of the squares of the shares
+    num    : int, the number of boards
+
+    return: float, the standard error
+    """
+    mean = shares / num
+    return math.sqrt(max(squares / num - mean * mean, 0.0) / num)
+
+def _param_error(holes, board, dead, stderr, max_exact, workers):
+    """Validate parameters, see equity().
+
+    return: tuple(list of tuple of int, tuple of int, tuple of int), the hole cards, the board and
+            the dead cards
+
+    exceptions: ValueError, if a parameter is not valid
+    """
+    holes = [tuple(hole) for hole in holes]
+    board, dead = tuple(board), tuple(dead)
+    codes = board + dead + sum(holes, ())
+    if not MIN_PLAYERS <= len(holes) <= MAX_PLAYERS or \
+       any(len(hole) != HOLE_CARDS for hole in holes) or len(board) > BOARD_CARDS:
+        raise ValueError(f"error: there must be {MIN_PLAYERS} to {MAX_PLAYERS} players with "
+                         f"{HOLE_CARDS} hole cards each and at most {BOARD_CARDS} board cards")
+    if any(not isinstance(code, int) or not 0 <= code < len(card.CARDS) for code in codes) or \
+       len(set(codes)) != len(codes):
+        raise ValueError(f"error: the cards must be distinct card codes in "
+                         f"[0, {len(card.CARDS) - 1}]")
+    if not stderr > 0 or max_exact < 0 or workers is not None and workers < 1:
+        raise ValueError("error: 'stderr' must be > 0, 'max_exact' >= 0 and 'workers' > 0")
+
+    return holes, board, dead
+
+_DESC = """\
+Calculate the win, tie and loss probabilities and the equity of Texas hold'em hands. The remaining
+boards are enumerated if there are at most --max-exact of them, otherwise they are sampled until the
+standard error of every equity is at most --stderr.
+"""
+
+def main():
+    """Main entry point.
+
+    return: int, success or failure
+    """
+    parser = argparse.ArgumentParser(formatter_class = argparse.RawTextHelpFormatter,
+                                     description = _DESC,
+                                     epilog = 'usage example: '
+                                              f'python {sys.argv[0]} AsKs QhQd -b "2c 7s 9s"')
+    parser.add_argument('holes', nargs = '+',
+                        help = "the hole cards of every player in short notation, e.g. AsKs")
+    parser.add_argument('-b', '--board', default = '',
+                        help = "the board cards in short notation (default: no board)")
+    parser.add_argument('-d', '--dead', default = '',
+                        help = "the dead cards in short notation (default: no dead cards)")
+    parser.add_argument('-e', '--stderr', type = float, default = STDERR,
+                        help = f"the target standard error with Monte Carlo (default: {STDERR})")
+    parser.add_argument('-x', '--max-exact', type = int, default = MAX_EXACT, dest = 'max_exact',
+                        help = "the max number of boards to enumerate (default: 200,000)")
+    parser.add_argument('-w', '--workers', type = int,
+                        help = "the number of worker processes (default: number of CPUs)")
+    parser.add_argument('--seed', type = int,
+                        help = "the master seed for reproducible samples (default: random)")
+    args = parser.parse_args()
+
+    try:
+        holes = [card.parse_codes(hole) for hole in args.holes]
+        result = equity(holes, card.parse_codes(args.board), card.parse_codes(args.dead),
+                        args.stderr, args.max_exact, args.workers,
+                        None if args.seed is None else utility.RandomStream(args.seed))
+    except ValueError as error:
+        print(error)
+        return 1
+
+    mode = 'exact' if result['exact'] else 'Monte Carlo'
+    print(f"{result['boards']:,} boards ({mode})")
+    print(f"{'hand':<8}{'win':>9}{'tie':>9}{'loss':>9}{'equity':>9}{'stderr':>9}")
+    for hole, player in zip(holes, result['players']):
+        print(f"{card.format_codes(hole):<8}{player['win']:>9.3%}{player['tie']:>9.3%}"
+              f"{player['loss']:>9.3%}{player['equity']:>9.3%}{player['stderr']:>9.3%}")
+
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,710 @@
+"""This module evaluates poker hands of 5 to 7 cards given as card codes (see card.Card.code). Every
+hand is mapped to a single integer, the strength of the hand. A stronger hand has a greater strength
+and hands of equal strength tie.
+
+The strength packs the hand type and the ranks of the five cards that decide a tie, i.e. the cards
+of the hand followed by the rest of the hand as classified by poker_hand.PokerHand:
+
+    strength = htype << 20 | r1 << 16 | r2 << 12 | r3 << 8 | r4 << 4 | r5
+
+A rank is 2 to 14 where the ace is 14, except in a 5 high straight where the ace is 1.
+
+The lookup-table evaluator uses two tables. If five or more cards share a suit, the hand is a flush
+or straight flush and the 13-bit mask of the ranks of that suit is looked up. Otherwise only the
+ranks matter and they are looked up by the product of a distinct prime per rank, which is the same
+for every order of the cards. The tables are built on first use.
+
+The bitmask evaluator needs no tables. It keeps a 13-bit mask of the ranks of every suit and masks
+of the ranks that occur at least once, twice, three times and four times. A suit mask with 5 bits set
+is a flush, a run of 5 bits found by ANDing shifted masks is a straight and the multiplicity masks
+give four of a kind, full house, three of a kind, two pair and pair. The masks are updated per card,
+see HandMasks, so a hand can be evaluated while cards are added to it.
+
+With NumPy, evaluate_batch() looks up a whole matrix of hands at once: the suit masks are ORed per
+row, the prime products are multiplied per row and searched in the sorted products of the table.
+evaluate_shared() evaluates the hands of several players that share cards, e.g. a board, so the
+shared cards are combined once per row.
+
+Hands that differ only by a permutation of the suits, e.g. the same ranks in hearts instead of
+spades, have the same strength. canonical() maps a hand to the representative of its suit
+isomorphism class and evaluate_cached() keeps the strengths of recent classes in a bounded cache.
+
+Run this module with 'verify' to check both evaluators against poker_hand.PokerHand.classify().
+"""
+import sys
+import random
+import argparse
+import itertools
+
+try:
+    import numpy
+except ImportError: # numpy is optional, evaluate_batch() falls back to evaluate()
+    numpy = None
+
+import utility
+
+# hand types, same values as in poker_hand.PokerHand
+HIGH_CARD = 0
+PAIR = 1
+TWO_PAIR = 2
+THREE_OF_A_KIND = 3
+STRAIGHT = 4
+FLUSH = 5
+FULL_HOUSE = 6
+FOUR_OF_A_KIND = 7
+STRAIGHT_FLUSH = 8
+
+MIN_NUM_CARDS = 5 # min number of cards in a hand
+MAX_NUM_CARDS = 7 # max number of cards in a hand
+
+NUM_RANKS = 13
+NUM_SUITS = 4
+ACE = 14 # rank of an ace, except in a 5 high straight
+_WHEEL_ACE = 1 # rank of an ace in a 5 high straight
+_RANK_BITS = 4 # bits per rank in a strength
+HTYPE_SHIFT = MIN_NUM_CARDS * _RANK_BITS # the hand type is stored above the five ranks
+
+CACHE_SIZE = 1 << 16 # max number of suit isomorphism classes in the cache of evaluate_cached()
+
+_PRIMES = (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41) # one prime per rank, 2 to ace
+_WHEEL = 0b1000000001111 # mask of ace, 5, 4, 3, 2
+
+# per card code: rank (2 to 14), rank bit (bit 0 is rank 2), suit and prime
+RANKS = tuple((code % NUM_RANKS - 1) % NUM_RANKS + 2 for code in range(NUM_SUITS * NUM_RANKS))
+BITS = tuple(1 << (rank - 2) for rank in RANKS)
+SUITS = tuple(code // NUM_RANKS for code in range(NUM_SUITS * NUM_RANKS))
+PRIMES = tuple(_PRIMES[rank - 2] for rank in RANKS)
+
+def make_strength(htype, ranks):
+    """Pack a hand type and the ranks that decide a tie into a strength.
+
+    htype: int, the hand type
+    ranks: sequence of int, the five ranks in order of importance
+
+    return: int, the strength
+    """
+    strength = htype
+    for rank in ranks:
+        strength = strength << _RANK_BITS | rank
+
+    return strength
+
+def hand_type(strength):
+    """return: int, the hand type of a strength"""
+    return strength >> HTYPE_SHIFT
+
+def hand_ranks(strength):
+    """return: tuple of int, the five ranks of a strength in order of importance"""
+    return tuple(strength >> shift & 0xF
+                 for shift in range(HTYPE_SHIFT - _RANK_BITS, -1, -_RANK_BITS))
+
+def straight_rank(mask):
+    """Get the rank of the highest card of the best straight in a mask of ranks.
+
+    mask: int, 13-bit mask, bit 0 is rank 2
+
+    return: int, the rank of the highest card or 0 if there's no straight
+    """
+    # shift the ranks up by one bit and add the ace as the lowest bit, so that the wheel
+    # (5, 4, 3, 2, ace) is a run of 5 bits as well
+    mask = mask << 1 | mask >> (NUM_RANKS - 1)
+
+    # bit i is set if bits i to i + 4 are set, i.e. if there's a straight whose lowest card is i
+    runs = mask & mask >> 1 & mask >> 2 & mask >> 3 & mask >> 4
+
+    return runs.bit_length() + MIN_NUM_CARDS - 1 if runs else 0
+
+def top_ranks(mask, num):
+    """Get the highest ranks of a mask of ranks.
+
+    mask: int, 13-bit mask, bit 0 is rank 2
+    num : int, the maximum number of ranks
+
+    return: list of int, up to num ranks in descending order
+    """
+    ranks = []
+    while mask and len(ranks) < num:
+        bit = mask.bit_length() - 1
+        ranks.append(bit + 2)
+        mask ^= 1 << bit
+
+    return ranks
+
+def _top_rank(mask):
+    """return: int, the highest rank of a non empty mask of ranks"""
+    return mask.bit_length() + 1
+
+def evaluate(codes):
+    """Evaluate a hand with the lookup tables.
+
+    codes: sequence of int, 5 to 7 distinct card codes
+
+    return: int, the strength of the hand
+    """
+    if _PRODUCTS is None:
+        _build_tables()
+
+    product = 1
+    masks = [0] * NUM_SUITS
+    for code in codes:
+        product *= PRIMES[code]
+        masks[SUITS[code]] |= BITS[code]
+
+    # with at most 7 cards a flush excludes four of a kind and full house, so it decides the hand
+    for mask in masks:
+        if mask.bit_count() >= MIN_NUM_CARDS:
+            return _FLUSHES[mask]
+
+    return _PRODUCTS[product]
+
+def rank_strength(product):
+    """Look up the strength of a hand that is not a flush.
+
+    product: int, the product of PRIMES of the 5 to 7 card codes of the hand
+
+    return: int, the strength
+    """
+    if _PRODUCTS is None:
+        _build_tables()
+
+    return _PRODUCTS[product]
+
+def suit_strength(mask):
+    """Look up the strength of the best straight flush or flush of a suit.
+
+    mask: int, the 13-bit rank mask of the cards of a suit
+
+    return: int, the strength or 0 if the suit has less than 5 cards
+    """
+    if _FLUSHES is None:
+        _build_tables()
+
+    return _FLUSHES[mask]
+
+def canonical_key(codes):
+    """Get the key of the suit isomorphism class of a hand.
+
+    Two hands are equal up to a permutation of the suits if they have the same rank masks per suit
+    regardless of the suit, so the key is the rank masks of the suits in descending order.
+
+    codes: sequence of int, distinct card codes
+
+    return: tuple of int, the 13-bit rank mask of every suit, in descending order
+    """
+    masks = [0] * NUM_SUITS
+    for code in codes:
+        masks[SUITS[code]] |= BITS[code]
+    masks.sort(reverse = True)
+
+    return tuple(masks)
+
+def canonical(codes):
+    """Map a hand to the representative of its suit isomorphism class, i.e. the hand whose suits
+    are renumbered so that suit 0 has the greatest rank mask, suit 1 the next one, etc.
+
+    codes: sequence of int, distinct card codes
+
+    return: tuple of int, the card codes of the representative in ascending order
+    """
+    return tuple(sorted(suit * NUM_RANKS + (rank - 1) % NUM_RANKS # the ace is the first card
+                        for suit, mask in enumerate(canonical_key(codes))
+                        for rank in top_ranks(mask, NUM_RANKS)))
+
+def evaluate_cached(codes):
+    """Evaluate a hand with the lookup tables and cache the strength of its suit isomorphism class.
+
+    The cache is CACHE, a utility.LRUCache of up to CACHE_SIZE classes, whose counters give the hit
+    rate.
+
+    codes: sequence of int, 5 to 7 distinct card codes
+
+    return: int, the strength of the hand
+    """
+    key = canonical_key(codes)
+    strength = CACHE.get(key)
+    if strength is None:
+        strength = evaluate(codes)
+        CACHE.put(key, strength)
+
+    return strength
+
+def evaluate_batch(codes):
+    """Evaluate many hands with the lookup tables.
+
+    codes: numpy.ndarray of int with shape (number of hands, number of cards) or, without NumPy,
+           sequence of sequence of int, the card codes of every hand, 5 to 7 distinct codes each
+
+    return: numpy.ndarray of int64 or, without NumPy, list of int, the strength of every hand
+
+    exceptions: ValueError, if codes is not a matrix of card codes with 5 to 7 columns
+    """
+    if numpy is None:
+        return [evaluate(hand) for hand in codes]
+
+    codes = numpy.asarray(codes)
+    if codes.ndim != 2 or not MIN_NUM_CARDS <= codes.shape[1] <= MAX_NUM_CARDS or \
+       codes.size and (codes.min() < 0 or codes.max() >= len(RANKS)):
+        raise ValueError(f"error: 'codes' must be a matrix of card codes in [0, {len(RANKS) - 1}] "
+                         f"with {MIN_NUM_CARDS} to {MAX_NUM_CARDS} columns")
+
+    bits, suits, primes, flushes, products, strengths = _numpy_tables()
+    codes = codes.astype(numpy.intp)
+
+    # hands without a flush: search the prime product of every hand in the sorted products
+    product = primes[codes].prod(axis = 1)
+    strength = strengths[numpy.searchsorted(products, product)]
+
+    # with at most 7 cards a flush beats every hand that is not a flush and the flush table is 0
+    # for suits with less than 5 cards, so the greater strength is the strength of the hand
+    code_bits = bits[codes]
+    code_suits = suits[codes]
+    for suit in range(NUM_SUITS):
+        mask = numpy.bitwise_or.reduce(numpy.where(code_suits == suit, code_bits, 0), axis = 1)
+        numpy.maximum(strength, flushes[mask], out = strength)
+
+    return strength
+
+def evaluate_shared(shared, private):
+    """Evaluate the hands of several players that share cards, e.g. the board in Texas hold'em.
+
+    The prime product and the suit masks of the shared cards are computed once per row and combined
+    with those of the private cards of every player. A flush needs at least 5 - len(private) shared
+    cards of a suit, so only such suits are checked.
+
+    shared : numpy.ndarray of int with shape (number of rows, number of cards) or, without NumPy,
+             sequence of sequence of int, the shared card codes of every row
+    private: sequence of sequence of int, the private card codes of every player, the same in every
+             row and distinct from the shared cards, 5 to 7 cards with the shared cards
+
+    return: numpy.ndarray of int64 with shape (number of players, number of rows) or, without NumPy,
+            list of list of int, the strength of the hand of every player in every row
+
+    exceptions: ValueError, if the number of cards is not valid
+    """
+    private = [tuple(codes) for codes in private]
+    num_shared = len(shared[0]) if len(shared) else 0
+    if any(not MIN_NUM_CARDS <= num_shared + len(codes) <= MAX_NUM_CARDS or
+           any(not 0 <= code < len(RANKS) for code in codes) for codes in private):
+        raise ValueError(f"error: the shared and private cards must be {MIN_NUM_CARDS} to "
+                         f"{MAX_NUM_CARDS} card codes in [0, {len(RANKS) - 1}]")
+
+    players = []
+    for codes in private:
+        product, masks = 1, [0] * NUM_SUITS
+        for code in codes:
+            product *= PRIMES[code]
+            masks[SUITS[code]] |= BITS[code]
+        players.append((product, masks, MIN_NUM_CARDS - len(codes)))
+
+    if numpy is not None:
+        return _evaluate_shared(numpy.asarray(shared), players)
+
+    if _PRODUCTS is None:
+        _build_tables()
+
+    strengths = [[] for codes in private]
+    for row in shared:
+        product, masks = 1, [0] * NUM_SUITS
+        for code in row:
+            product *= PRIMES[code]
+            masks[SUITS[code]] |= BITS[code]
+        counts = [mask.bit_count() for mask in masks]
+
+        for strength, (private_product, private_masks, min_shared) in zip(strengths, players):
+            best = _PRODUCTS[product * private_product]
+            for suit in range(NUM_SUITS):
+                if counts[suit] >= min_shared:
+                    best = max(best, _FLUSHES[masks[suit] | private_masks[suit]])
+            strength.append(best)
+
+    return strengths
+
+def _evaluate_shared(shared, players):
+    """Evaluate the hands of several players that share cards with NumPy, see evaluate_shared().
+
+    shared : numpy.ndarray of int, the shared card codes of every row
+    players: list of tuple(int, list of int, int), the prime product, the suit masks and the min
+             number of shared cards of a suit for a flush of the private cards of every player
+
+    return: numpy.ndarray of int64, the strength of the hand of every player in every row
+
+    exceptions: ValueError, if shared is not a matrix of card codes
+    """
+    if shared.ndim != 2 or shared.size and (shared.min() < 0 or shared.max() >= len(RANKS)):
+        raise ValueError(f"error: 'shared' must be a matrix of card codes in [0, {len(RANKS) - 1}]")
+
+    bits, suits, primes, flushes, products, strengths = _numpy_tables()
+    shared = shared.astype(numpy.intp)
+
+    product = primes[shared].prod(axis = 1)
+    code_bits = bits[shared]
+    code_suits = suits[shared]
+    masks, counts = [], []
+    for suit in range(NUM_SUITS):
+        in_suit = code_suits == suit
+        masks.append(numpy.bitwise_or.reduce(numpy.where(in_suit, code_bits, 0), axis = 1))
+        counts.append(int(in_suit.sum(axis = 1).max(initial = 0)))
+
+    result = numpy.empty((len(players), len(shared)), dtype = numpy.int64)
+    for strength, (private_product, private_masks, min_shared) in zip(result, players):
+        strength[:] = strengths[numpy.searchsorted(products, product * private_product)]
+        for suit in range(NUM_SUITS):
+            if counts[suit] >= min_shared: # some row may have a flush in this suit
+                numpy.maximum(strength, flushes[masks[suit] | private_masks[suit]], out = strength)
+
+    return result
+
+def evaluate_masks(codes):
+    """Evaluate a hand with rank masks, see HandMasks.
+
+    codes: sequence of int, 5 to 7 distinct card codes
+
+    return: int, the strength of the hand
+    """
+    suits = [0] * NUM_SUITS
+    singles = pairs = threes = fours = 0
+    for code in codes:
+        bit = BITS[code]
+        suits[SUITS[code]] |= bit
+        fours |= threes & bit
+        threes |= pairs & bit
+        pairs |= singles & bit
+        singles |= bit
+
+    return _masks_strength(suits, singles, pairs, threes, fours)
+
+def hand_strength(hand):
+    """Calculate the strength of a classified hand.
+
+    hand: list, a hand classified by poker_hand.PokerHand.classify() in normal flow, i.e. the hand
+                type, the cards of the hand and the rest of the hand if any
+
+    return: int, the strength of the hand
+    """
+    ranks = [card.rank if card.rank != 1 else ACE for cards in hand[1:] for card in cards]
+    if hand[0] in (STRAIGHT, STRAIGHT_FLUSH) and ranks[0] == 5: # 5 high straight, the ace is last
+        ranks[-1] = _WHEEL_ACE
+
+    return make_strength(hand[0], ranks)
+
+class HandMasks:
+    """Rank masks of a hand that are updated card by card.
+
+    Attributes:
+      suits: list of 4 13-bit masks, the ranks of every suit
+      counts: list of 4 13-bit masks, the ranks that occur at least once, twice, three times and
+              four times
+    """
+    __slots__ = ('suits', 'counts')
+
+    def __init__(self, masks = None):
+        """ctor
+
+        masks: HandMasks or None, the masks to copy, None for a hand without cards
+        """
+        if masks is None:
+            self.suits = [0] * NUM_SUITS
+            self.counts = [0] * NUM_SUITS
+        else:
+            self.suits = masks.suits[:]
+            self.counts = masks.counts[:]
+
+    def __len__(self):
+        """return: int, the number of cards"""
+        return sum(mask.bit_count() for mask in self.suits)
+
+    def add(self, code):
+        """Add a card.
+
+        code: int, the code of a card that is not part of the hand
+        """
+        bit = BITS[code]
+        counts = self.counts
+        self.suits[SUITS[code]] |= bit
+        counts[3] |= counts[2] & bit
+        counts[2] |= counts[1] & bit
+        counts[1] |= counts[0] & bit
+        counts[0] |= bit
+
+    def strength(self):
+        """Calculate the strength of the best 5 card hand, there have to be 5 to 7 cards.
+
+        return: int, the strength
+        """
+        return _masks_strength(self.suits, *self.counts)
+
+    def hand_type(self):
+        """Get the hand type, with less than 5 cards the type made by cards of the same rank, i.e.
+        four of a kind, three of a kind, two pair, pair or high card.
+
+        return: int, the hand type
+        """
+        if len(self) >= MIN_NUM_CARDS:
+            return hand_type(self.strength())
+
+        singles, pairs, threes, fours = self.counts
+        if fours:
+            return FOUR_OF_A_KIND
+        if threes:
+            return THREE_OF_A_KIND
+        if pairs:
+            return TWO_PAIR if pairs.bit_count() > 1 else PAIR
+        return HIGH_CARD
+
+def verify(num_cards = MIN_NUM_CARDS, samples = None, rng = None):
+    """Check that both evaluators agree with poker_hand.PokerHand.classify().
+
+    num_cards: int, the number of cards per hand, 5 to 7
+    samples  : int or None, the number of random hands to check, None checks every hand, e.g. all
+               2,598,960 hands of 5 cards
+    rng      : random.Random or None, the random number generator for samples
+
+    return: list of tuple(int), the card codes of the hands where an evaluator disagrees
+    """
+    from poker_hand import PokerHand # poker_hand imports this module
+    from card import CARDS
+
+    if samples is None:
+        hands = itertools.combinations(range(len(CARDS)), num_cards)
+    else:
+        sample = (rng or random).sample
+        hands = (sample(range(len(CARDS)), num_cards) for i in range(samples))
+
+    errors = []
+    hand = PokerHand()
+    for codes in hands:
+        hand.cards = [CARDS[code] for code in codes]
+        strength = hand_strength(hand.classify())
+        if evaluate(codes) != strength or evaluate_masks(codes) != strength:
+            errors.append(tuple(codes))
+
+    return errors
+
+def _masks_strength(suits, singles, pairs, threes, fours):
+    """Calculate the strength of the best 5 card hand from rank masks, see HandMasks.
+
+    suits  : list of int, the 13-bit rank mask of every suit
+    singles: int, the ranks that occur at least once
+    pairs  : int, the ranks that occur at least twice
+    threes : int, the ranks that occur at least three times
+    fours  : int, the ranks that occur four times
+
+    return: int, the strength
+    """
+    flush = 0
+    for mask in suits:
+        if mask.bit_count() >= MIN_NUM_CARDS:
+            high = straight_rank(mask)
+            if high:
+                return make_strength(STRAIGHT_FLUSH, _straight_ranks(high))
+            flush = mask
+            break
+
+    if fours:
+        four = _top_rank(fours)
+        kicker = _top_rank(singles & ~(1 << (four - 2)))
+        return make_strength(FOUR_OF_A_KIND, [four] * 4 + [kicker])
+    if threes:
+        three = _top_rank(threes)
+        others = pairs & ~(1 << (three - 2)) # pairs, or a second three, of other ranks
+        if others:
+            return make_strength(FULL_HOUSE, [three] * 3 + [_top_rank(others)] * 2)
+    if flush:
+        return make_strength(FLUSH, top_ranks(flush, MIN_NUM_CARDS))
+
+    high = straight_rank(singles)
+    if high:
+        return make_strength(STRAIGHT, _straight_ranks(high))
+    if threes:
+        return make_strength(THREE_OF_A_KIND,
+                             [three] * 3 + top_ranks(singles & ~(1 << (three - 2)), 2))
+    if pairs:
+        high_pair = _top_rank(pairs)
+        pairs &= ~(1 << (high_pair - 2))
+        if pairs:
+            low_pair = _top_rank(pairs)
+            singles &= ~(1 << (high_pair - 2) | 1 << (low_pair - 2))
+            return make_strength(TWO_PAIR, [high_pair] * 2 + [low_pair] * 2 +
+                                           top_ranks(singles, 1))
+        return make_strength(PAIR, [high_pair] * 2 +
+                                   top_ranks(singles & ~(1 << (high_pair - 2)), 3))
+
+    return make_strength(HIGH_CARD, top_ranks(singles, MIN_NUM_CARDS))
+
+def _flush_strength(mask):
+    """Calculate the strength of the best straight flush or flush.
+
+    mask: int, 13-bit mask of the ranks of a suit with at least 5 cards
+
+    return: int, the strength
+    """
+    high = straight_rank(mask)
+    if high:
+        return make_strength(STRAIGHT_FLUSH, _straight_ranks(high))
+
+    return make_strength(FLUSH, top_ranks(mask, MIN_NUM_CARDS))
+
+def _rank_strength(counts):
+    """Calculate the strength of a hand that is not a flush from the ranks of its cards.
+
+    counts: list of tuple(int, int), (rank, number of cards) of every rank of the hand in
+            descending order of rank
+
+    return: int, the strength
+    """
+    # ranks that occur at least once, twice, etc., in descending order
+    singles = [rank for rank, count in counts]
+    pairs = [rank for rank, count in counts if count >= 2]
+    threes = [rank for rank, count in counts if count >= 3]
+    fours = [rank for rank, count in counts if count == 4]
+
+    def kickers(*used):
+        return [rank for rank in singles if rank not in used]
+
+    mask = 0
+    for rank in singles:
+        mask |= 1 << (rank - 2)
+    high = straight_rank(mask)
+
+    if fours:
+        return make_strength(FOUR_OF_A_KIND, [fours[0]] * 4 + kickers(fours[0])[:1])
+    if threes and len(pairs) >= 2:
+        pair = pairs[1] if pairs[0] == threes[0] else pairs[0]
+        return make_strength(FULL_HOUSE, [threes[0]] * 3 + [pair] * 2)
+    if high:
+        return make_strength(STRAIGHT, _straight_ranks(high))
+    if threes:
+        return make_strength(THREE_OF_A_KIND, [threes[0]] * 3 + kickers(threes[0])[:2])
+    if len(pairs) >= 2:
+        return make_strength(TWO_PAIR, [pairs[0]] * 2 + [pairs[1]] * 2 +
+                                       kickers(pairs[0], pairs[1])[:1])
+    if pairs:
+        return make_strength(PAIR, [pairs[0]] * 2 + kickers(pairs[0])[:3])
+
+    return make_strength(HIGH_CARD, singles[:MIN_NUM_CARDS])
+
+def _straight_ranks(high):
+    """return: list of int, the ranks of a straight in descending order, the ace of a 5 high
+                            straight is last and has rank 1
+    """
+    if high == 5:
+        return [5, 4, 3, 2, _WHEEL_ACE]
+
+    return list(range(high, high - MIN_NUM_CARDS, -1))
+
+def _build_flushes():
+    """return: list of int, the flush strength of every 13-bit mask with at least 5 ranks, else 0"""
+    return [_flush_strength(mask) if mask.bit_count() >= MIN_NUM_CARDS else 0
+            for mask in range(1 << NUM_RANKS)]
+
+def _build_products():
+    """return: dict(int, int), the strength of every multiset of 5 to 7 ranks by prime product"""
+    products = {}
+
+    def extend(high, num, product, counts):
+        """Add a multiset and every multiset that extends it with ranks lower than 'high'."""
+        if num >= MIN_NUM_CARDS:
+            products[product] = _rank_strength(counts)
+
+        for rank in range(high, 1, -1):
+            prime = _PRIMES[rank - 2]
+            for count in range(1, min(NUM_SUITS, MAX_NUM_CARDS - num) + 1):
+                extend(rank - 1, num + count, product * prime ** count, counts + [(rank, count)])
+
+    extend(ACE, 0, 1, [])
+
+    return products
+
+def _numpy_tables():
+    """Get the lookup tables as NumPy arrays, they are created on first use.
+
+    return: tuple of numpy.ndarray, the rank bit, suit and prime per card code, the flush table,
+                                    the sorted prime products and their strengths
+    """
+    global _NUMPY_TABLES
+    if _NUMPY_TABLES is None:
+        if _PRODUCTS is None:
+            _build_tables()
+        products = sorted(_PRODUCTS)
+        _NUMPY_TABLES = (numpy.array(BITS, dtype = numpy.intp),
+                         numpy.array(SUITS, dtype = numpy.intp),
+                         numpy.array(PRIMES, dtype = numpy.int64),
+                         numpy.array(_FLUSHES, dtype = numpy.int64),
+                         numpy.array(products, dtype = numpy.int64),
+                         numpy.array([_PRODUCTS[product] for product in products],
+                                     dtype = numpy.int64))
+
+    return _NUMPY_TABLES
+
+def type_tables():
+    """Get the hand types of the lookup tables, for simulations that only need the hand type. The
+    tables are created on first use.
+
+    return: tuple(dict(int, int), list of int), the hand type per prime product of the ranks of a
+            hand that is not a flush and per 13-bit mask of the ranks of a suit with 5 ranks or
+            more (HIGH_CARD for less than 5 ranks)
+    """
+    global _TYPE_TABLES
+    if _TYPE_TABLES is None:
+        if _PRODUCTS is None:
+            _build_tables()
+        _TYPE_TABLES = ({product: hand_type(strength) for product, strength in _PRODUCTS.items()},
+                        [hand_type(strength) for strength in _FLUSHES])
+
+    return _TYPE_TABLES
+
+def load_tables():
+    """Build the lookup tables now instead of on first use, e.g. before starting worker processes
+    that inherit them."""
+    if _PRODUCTS is None:
+        _build_tables()
+    if numpy is not None:
+        _numpy_tables()
+
+def _build_tables():
+    """Build the lookup tables, called on first use as this takes a fraction of a second."""
+    global _FLUSHES, _PRODUCTS
+    _FLUSHES = _build_flushes()
+    _PRODUCTS = _build_products()
+
+_FLUSHES = None  # 13-bit mask of a suit -> strength
+_PRODUCTS = None # prime product of ranks -> strength
+_NUMPY_TABLES = None # see _numpy_tables()
+_TYPE_TABLES = None # see type_tables()
+
+CACHE = utility.LRUCache(CACHE_SIZE) # canonical_key() -> strength, see evaluate_cached()
+
+_DESC = """\
+Check the lookup-table and the bitmask evaluators against the classifier of module poker_hand.
+"""
+
+def main():
+    """Main entry point.
+
+    return: int, success or failure
+    """
+    parser = argparse.ArgumentParser(formatter_class = argparse.RawTextHelpFormatter,
+                                     description = _DESC,
+                                     epilog = 'usage example: '
+                                              f'python {sys.argv[0]} verify -c 7 -s 100000')
+    parser.add_argument('command', choices = ['verify'],
+                        help = "the command to execute")
+    parser.add_argument('-c', '--cards', type = int, default = MIN_NUM_CARDS,
+                        choices = range(MIN_NUM_CARDS, MAX_NUM_CARDS + 1),
+                        help = f"the number of cards per hand (default: {MIN_NUM_CARDS})")
+    parser.add_argument('-s', '--samples', type = int,
+                        help = "the number of random hands to check (default: every hand)")
+    parser.add_argument('--seed', type = int,
+                        help = "the master seed for reproducible samples (default: random)")
+    args = parser.parse_args()
+
+    rng = None if args.seed is None else utility.RandomStream(args.seed)
+    errors = verify(args.cards, args.samples, rng)
+    for codes in errors[:10]:
+        print(f"error: the evaluators disagree on card codes {codes}")
+    print(f"{len(errors)} hand(s) of {args.cards} cards in error")
+
+    return 1 if errors else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,10 +1,21 @@
 """This program classifies a poker hand from a list of cards. It can print the poker hand and
 compare it to a different one to identify the better hand.
+
+Run with 'evaluate' to classify a file of hands in short notation, one hand per line.
 """
 import sys
-import copy
+import argparse
+import operator
+import contextlib
+import itertools
+
+try:
+    import numpy
+except ImportError: # numpy is optional, evaluate_file() then evaluates hand by hand
+    numpy = None
 
-from card import Hand, Deck, Card
+import poker_eval
+from card import Hand, Deck, Card, TOKENS
 
 class PokerHand(Hand):
     """Classifies a poker hand from a list of cards. The number of cards must be within a valid
@@ -24,6 +35,12 @@ class PokerHand(Hand):
     MIN_NUM_CARDS = 5 # min number of cards in a hand
     MAX_NUM_CARDS = 7 # max number of cards in a hand
 
+    # classification algorithms, see classify()
+    DICT_EVALUATOR = 0 # group the cards by suit and rank in dicts
+    TABLE_EVALUATOR = 1 # look the card codes up in the tables of module poker_eval
+    BITMASK_EVALUATOR = 2 # rank masks per suit and per number of cards of module poker_eval
+    CACHED_EVALUATOR = 3 # TABLE_EVALUATOR behind a cache of suit isomorphic hands
+
     _LABELS = ("high card", "pair", "two pair", "three of a kind", "straight",
                 "flush", "full house", "four of a kind", "straight flush", "rest of hand")
     _LABEL_WIDTH = len(max(_LABELS, key = len)) # maximum width of a hand label
@@ -73,33 +90,71 @@ class PokerHand(Hand):
         super().add_card(card)
         return True
 
-    def classify(self, normal_flow = True, print_error = True):
+    @property
+    def cards(self):
+        """The cards of the hand. Mutations of the list are tracked, so that an unchanged hand is
+        not classified again.
+
+        return: list of Card
+        """
+        return self.__cards
+
+    @cards.setter
+    def cards(self, cards):
+        """cards: iterable of Card, the new cards of the hand"""
+        self.__cards = _CardList(cards)
+
+    def classify(self, normal_flow = True, print_error = True, evaluator = DICT_EVALUATOR,
+                 kickers = False):
         """Classify hand from a list of cards.
 
+        All evaluators produce the same hand types and cards. TABLE_EVALUATOR maps the card codes
+        to a strength with a few table lookups and BITMASK_EVALUATOR with rank mask arithmetic (see
+        module poker_eval), then the cards of the hand are picked. TABLE_EVALUATOR is the fastest
+        for 6 and 7 cards, BITMASK_EVALUATOR needs no tables. CACHED_EVALUATOR caches the strength
+        of hands that are equal up to a permutation of the suits, see poker_eval.evaluate_cached().
+
         normal_flow: bool, True if no performance optimizations
         print_error: bool, print errors if any
+        evaluator  : int, DICT_EVALUATOR, TABLE_EVALUATOR, BITMASK_EVALUATOR or CACHED_EVALUATOR
+        kickers    : bool, if True add the rest of the hand when there are performance
+                     optimizations as well, so that hands can be compared, e.g. by
+                     poker_eval.hand_strength() (the rest is always added in normal flow)
 
         return: list (see definition of self.__hand), the classified hand
         """
         if normal_flow != self.__normal_flow and not isinstance(normal_flow, bool):
             print(f"error: 'normal_flow' = '{normal_flow}' must be of type 'bool'")
             return self.__hand
+        if evaluator not in _EVALUATORS:
+            print(f"error: 'evaluator' = '{evaluator}' must be within "
+                  f"[{PokerHand.DICT_EVALUATOR}, {PokerHand.CACHED_EVALUATOR}]")
+            return self.__hand
+        if not isinstance(kickers, bool):
+            print(f"error: 'kickers' = '{kickers}' must be of type 'bool'")
+            return self.__hand
 
         if not normal_flow or self.__update(print_error): # check if cards have been updated
             self.__reset(normal_flow) # reset data attributes
 
-            # iterate over all cards and populate data structures for suits and ranks
-            for card in self.cards:
-                self.__suits.setdefault(card.suit, []).append(card)
-                self.__ranks.setdefault(card.rank, []).append(card)
+            if evaluator != PokerHand.DICT_EVALUATOR:
+                self.__evaluate(_EVALUATORS[evaluator]([card.code for card in self.cards]))
+            else:
+                # iterate over all cards and populate data structures for suits and ranks
+                suits = self.__suits
+                ranks = self.__ranks
+                for card in self.cards:
+                    suits.setdefault(card.suit, []).append(card)
+                    ranks.setdefault(card.rank, []).append(card)
 
-            self.__suit() # check for straight flush or flush
-            self.__rank() # check for 4 of a kind, full house, straight, 3 of a kind, 2 pair or pair
+                self.__suit() # check for straight flush or flush
+                self.__rank() # check for 4 of a kind, full house, straight, 3 of a kind,
+                              # 2 pair or pair
 
-            if not self.__hand: # add high card if no hand was added
-                self.__add(PokerHand.HIGH_CARD, [self.__high_card()])
+                if not self.__hand: # add high card if no hand was added
+                    self.__add(PokerHand.HIGH_CARD, [self.__high_card()])
 
-            if self.__normal_flow: # no performance optimizations
+            if self.__normal_flow or kickers: # no performance optimizations or kickers requested
                 self.__rest() # add the rest of the hand, if any
 
         return self.__hand
@@ -121,6 +176,33 @@ class PokerHand(Hand):
 
         return htype == self.__hand[0] if self.classify() else False
 
+    @property
+    def strength(self):
+        """The strength of the hand as a single int that encodes the hand type and the ranks of the
+        cards of the hand and of the rest of the hand (see module poker_eval). A better hand has a
+        greater strength and equal hands have the same strength.
+
+        return: int or None, the strength or None if the hand is incomplete
+        """
+        if not self.classify():
+            return None
+        if self.__strength is None:
+            self.__strength = poker_eval.hand_strength(self.__hand)
+
+        return self.__strength
+
+    @staticmethod
+    def key(hand):
+        """Key function to sort or rank poker hands by a plain int comparison, e.g.
+        sorted(hands, key = PokerHand.key) or max(hands, key = PokerHand.key).
+
+        hand: PokerHand
+
+        return: int, the strength of the hand or -1 if the hand is incomplete
+        """
+        strength = hand.strength
+        return -1 if strength is None else strength
+
     def compare(self, other):
         """Compare this hand to the hand passed in as a parameter.
 
@@ -231,22 +313,14 @@ class PokerHand(Hand):
                   f"'{self.__class__.__module__}.{self.__class__.__name__}'")
             return NotImplemented
 
-        self.classify()
-        other_hand = other.classify() # get hand for other object
-
-        # Two hands are equal if the hand types are equal and the ranks of the cards are equal. If
-        # rest of hand exists, card ranks must be equal as well.
-        if self.__hand and other_hand:
-            # hands have the same type and same cards based on rank
-            if self.__hand[0] == other_hand[0] and _compare_eq(self.__hand[1], other_hand[1]):
-                # compare rest of hand if it exists
-                return _compare_eq(self.__hand[2], other_hand[2]) \
-                       if len(self.__hand) == PokerHand.__MAXLEN_HAND \
-                       else True
-        else:
+        # Two hands are equal if the hand types are equal and the ranks of the cards are equal,
+        # including the rest of the hand, which is what the strength encodes.
+        strength = self.strength
+        other_strength = other.strength
+        if strength is None or other_strength is None:
             return NotImplemented
 
-        return False
+        return strength == other_strength
 
     def __lt__(self, other):
         """Overloaded '<' operator.
@@ -262,24 +336,12 @@ class PokerHand(Hand):
                   f"'{self.__class__.__module__}.{self.__class__.__name__}'")
             return NotImplemented
 
-        self.classify()
-        other_hand = other.classify() # get hand for other object
-
-        if self.__hand and other_hand:
-            if self.__hand[0] < other_hand[0]: # one hand is smaller than the other
-                return True
-            if self.__hand[0] == other_hand[0]: # hands have same hand type
-                cmp = _compare_lt(self.__hand[1], other_hand[1]) # compare cards of hands
-                if cmp is None: # cards are equal
-                    # compare rest of hand if it exists
-                    return bool(_compare_lt(self.__hand[2], other_hand[2])) \
-                           if len(self.__hand) == PokerHand.__MAXLEN_HAND \
-                           else False
-                return cmp
-        else:
+        strength = self.strength
+        other_strength = other.strength
+        if strength is None or other_strength is None:
             return NotImplemented
 
-        return False
+        return strength < other_strength
 
     def __le__(self, other):
         """Overloaded '<=' operator.
@@ -329,7 +391,7 @@ class PokerHand(Hand):
                 print(f"{super().__str__()}\n\n"
                       f"error: the number of cards in a hand must be >= {PokerHand.MIN_NUM_CARDS}")
             return False
-        if sorted(self.__cards_copy) == sorted(self.cards): # check if cards have been updated
+        if self.__version == self.__cards.version: # check if cards have been updated
             return False
 
         return True
@@ -340,11 +402,11 @@ class PokerHand(Hand):
         normal_flow: bool, True if no performance optimizations
         """
         self.__normal_flow = normal_flow # if False, enable performance optimizations
-        self.__cards_copy = [] # copy of the cards
-        if self.__normal_flow: # copy the cards
-            self.__cards_copy = copy.deepcopy(self.cards)
+        # the version of the classified cards, None if the hand is not classified in normal flow
+        self.__version = self.__cards.version if self.__normal_flow else None
         self.__suits = {} # cards with same suit
         self.__ranks = {} # cards with same rank
+        self.__strength = None # the strength of the hand, calculated on demand
 
         # Hand classified from list of cards. Its structure is as follows:
         #
@@ -511,6 +573,33 @@ class PokerHand(Hand):
 
         return False
 
+    def __evaluate(self, strength):
+        """Add the hand of a strength calculated by module poker_eval.
+
+        The cards of the hand are picked the same way as by the dict evaluator: the cards of a suit
+        hand are the cards of the suit and the cards of a rank are picked in the order of the list
+        of cards.
+
+        strength: int, the strength of the cards
+        """
+        groups = _GROUPS.get(strength)
+        if groups is None:
+            groups = _GROUPS[strength] = _groups(strength)
+        htype = groups[0]
+
+        if htype in (PokerHand.FLUSH, PokerHand.STRAIGHT_FLUSH):
+            suits = [0] * len(Card.suit_names) # number of cards per suit
+            for card in self.cards:
+                suits[card.suit] += 1
+            suit = suits.index(max(suits)) # the suit of the suit hand
+            hand = [Card(suit, rank) for rank, count in groups[1]]
+        else:
+            hand = []
+            for rank, count in groups[1]:
+                hand.extend([card for card in self.cards if card.rank == rank][:count])
+
+        self.__add(htype, hand)
+
     def __add(self, htype, hand):
         """Add a single hand and its label.
 
@@ -546,27 +635,65 @@ class PokerHand(Hand):
             # so that 'hand + rest = MIN_NUM_CARDS'.
             rest = PokerHand.MIN_NUM_CARDS - len(self.__hand[1])
             if rest:
-                # delete cards that are part of the hand to facilitate extracting the rest of the
-                # hand
-                for card in self.__hand[1]:
-                    self.__cards_copy.remove(card)
+                # the cards that are not part of the hand, no card is copied
+                hand = {card.code for card in self.__hand[1]}
+                cards = [card for card in self.cards if card.code not in hand]
 
                 # the remaining cards are part of the rest of the hand and are sorted descendingly
                 # by rank
-                self.__cards_copy.sort(key=lambda card: card.rank, reverse = True)
+                cards.sort(key=_RANK, reverse = True)
 
                 # if an ace exists, add it to the top of the list
-                if self.__cards_copy[-1].rank == 1:
-                    self.__cards_copy.insert(0, self.__cards_copy.pop())
+                if cards[-1].rank == 1:
+                    cards.insert(0, cards.pop())
 
-                self.__hand.append(self.__cards_copy[:rest]) # finally, add the rest of the hand
-                self.__cards_copy.extend(copy.deepcopy(self.__hand[1])) # restore original cards
+                self.__hand.append(cards[:rest]) # finally, add the rest of the hand
 
-def main():
-    """Main entry point.
+class _CardList(list):
+    """A list of cards that counts its mutations.
 
-    return: int, success or failure
+    Every mutation assigns a new version from a global counter, so two lists never share a version
+    and replacing the list of cards of a hand is detected as well. Sorting or reversing the cards
+    keeps the version, as the cards of the hand stay the same.
     """
+    __slots__ = ('version',)
+
+    def __init__(self, cards = ()):
+        """cards: iterable of Card"""
+        super().__init__(cards)
+        self.version = next(_VERSIONS)
+
+    def __reduce__(self):
+        """Pickle and copy the cards only, a copy gets a new version."""
+        return self.__class__, (list(self),)
+
+def _tracked(name):
+    """Create a method that calls a mutating list method and updates the version.
+
+    name: str, the name of the list method
+
+    return: function, the method
+    """
+    method = getattr(list, name)
+
+    def mutate(self, *args):
+        result = method(self, *args)
+        self.version = next(_VERSIONS)
+        return result
+
+    mutate.__name__ = name
+    mutate.__doc__ = method.__doc__
+
+    return mutate
+
+for _name in ('append', 'extend', 'insert', 'pop', 'remove', 'clear',
+              '__setitem__', '__delitem__', '__iadd__', '__imul__'):
+    setattr(_CardList, _name, _tracked(_name))
+
+_VERSIONS = itertools.count() # versions of lists of cards
+
+def demo():
+    """Classify and compare a few hard-coded hands."""
     hand = PokerHand()
     print(hand(PokerHand.TWO_PAIR))
     print(hand) # test __str__() with no cards
@@ -600,7 +727,190 @@ def main():
     print(">= :", hand >= hand2)
     print(hand.compare(hand2)) # test compare()
 
-    return 0
+_DESC = """\
+Classify poker hands. 'demo' classifies and compares a few hard-coded hands, 'evaluate' classifies a
+file of hands in short notation, one hand of 5 to 7 cards per line (e.g. 'As Kd 7h 7c 2s'), and
+writes the hand type, strength and label of every line as CSV or JSONL. Invalid lines get an empty
+type and strength and the label 'invalid'.
+"""
+
+def main():
+    """Main entry point.
+
+    return: int, success or failure
+    """
+    parser = argparse.ArgumentParser(formatter_class = argparse.RawTextHelpFormatter,
+                                     description = _DESC,
+                                     epilog = 'usage example: '
+                                              f'python {sys.argv[0]} evaluate -i hands.txt '
+                                              '-o hands.csv')
+    parser.add_argument('command', nargs = '?', choices = ['demo', 'evaluate'], default = 'demo',
+                        help = "the command to execute (default: demo)")
+    parser.add_argument('-i', '--input', default = '-',
+                        help = "the file of hands, '-' for stdin (default: -)")
+    parser.add_argument('-o', '--output', default = '-',
+                        help = "the output file, '-' for stdout (default: -)")
+    parser.add_argument('-f', '--format', choices = list(_FORMATS), default = 'csv',
+                        help = "the output format (default: csv)")
+    parser.add_argument('-b', '--batch', type = int, default = BATCH_SIZE,
+                        help = f"the number of lines per batch (default: {BATCH_SIZE:,})")
+    args = parser.parse_args()
+
+    if args.command == 'demo':
+        demo()
+        return 0
+
+    if args.batch < 1:
+        sys.exit("error: 'batch' must be an integer > 0")
+
+    try:
+        with contextlib.ExitStack() as files: # closes the opened files, also if an open fails
+            infile = sys.stdin if args.input == '-' else \
+                     files.enter_context(open(args.input, encoding = 'utf-8',
+                                              buffering = _BUFFER_SIZE))
+            outfile = sys.stdout if args.output == '-' else \
+                      files.enter_context(open(args.output, 'w', encoding = 'utf-8',
+                                               buffering = _BUFFER_SIZE))
+            lines, errors = evaluate_file(infile, outfile, args.format, args.batch)
+    except (OSError, ValueError) as exc:
+        sys.exit(f"error: {exc}")
+    print(f"{lines} line(s), {errors} invalid", file = sys.stderr)
+
+    return 1 if errors else 0
+
+def classify_batch(codes):
+    """Classify many hands given as card codes without creating PokerHand objects.
+
+    The hands are evaluated by the lookup tables of module poker_eval, with NumPy the whole batch is
+    evaluated by array operations. The results are identical to PokerHand.classify() and
+    PokerHand.strength.
+
+    codes: numpy.ndarray of int with shape (number of hands, number of cards) or, without NumPy,
+           sequence of sequence of int, the card codes (see card.Card.code) of every hand, 5 to 7
+           distinct codes each
+
+    return: tuple(numpy.ndarray, numpy.ndarray) or, without NumPy, tuple(list of int, list of int),
+            the hand type (e.g. PokerHand.PAIR) and the strength of every hand
+
+    exceptions: ValueError, if codes is not a matrix of card codes with 5 to 7 columns
+    """
+    strengths = poker_eval.evaluate_batch(codes)
+    if isinstance(strengths, list):
+        return [poker_eval.hand_type(strength) for strength in strengths], strengths
+
+    return strengths >> poker_eval.HTYPE_SHIFT, strengths
+
+def evaluate_file(infile, outfile, fmt = 'csv', batch = None):
+    """Classify a file of hands in short notation, one hand of 5 to 7 cards per line (e.g.
+    'As Kd 7h 7c 2s'), and write the hand type, strength and label of every line.
+
+    The lines are read in batches, the cards of a batch are looked up in the token table
+    card.TOKENS at once and its hands are classified by poker_eval.evaluate_batch() per number of
+    cards, so memory does not depend on the size of the file. Lines that are not a hand are written
+    with an empty type and strength and the label 'invalid'.
+
+    infile : text file, the hands
+    outfile: text file, the output, one line per line of infile
+    fmt    : str, the output format, 'csv' (with a header) or 'jsonl'
+    batch  : int or None, the number of lines per batch, None for BATCH_SIZE
+
+    return: tuple(int, int), the number of lines and of invalid lines
+
+    exceptions: ValueError, if fmt or batch is not valid
+    """
+    if fmt not in _FORMATS or batch is not None and batch < 1:
+        raise ValueError(f"error: 'fmt' must be one of {list(_FORMATS)} and 'batch' > 0")
+
+    header, rows, invalid = _FORMATS[fmt]
+    outfile.write(header)
+    shift = poker_eval.HTYPE_SHIFT
+    num_lines = num_errors = 0
+    for lines in iter(lambda: list(itertools.islice(infile, batch or BATCH_SIZE)), []):
+        strengths = _line_strengths(lines)
+        outfile.write(''.join(invalid if strength < 0 else rows[strength >> shift] % strength
+                              for strength in strengths))
+        num_lines += len(lines)
+        num_errors += strengths.count(-1)
+
+    outfile.flush()
+
+    return num_lines, num_errors
+
+def _line_strengths(lines):
+    """Evaluate lines of hands in short notation.
+
+    lines: list of str, one hand per line
+
+    return: list of int, the strength of every hand, -1 if the line is not a valid hand
+    """
+    if numpy is None:
+        strengths = []
+        for line in lines:
+            hand = list(map(TOKENS.get, line.split(), itertools.repeat(-1)))
+            valid = PokerHand.MIN_NUM_CARDS <= len(hand) <= PokerHand.MAX_NUM_CARDS and \
+                    -1 not in hand and len(set(hand)) == len(hand)
+            strengths.append(poker_eval.evaluate(hand) if valid else -1)
+        return strengths
+
+    # the tokens of all lines are split at once and the tokens of every line are found by the number
+    # of tokens per line, so no list is kept per line
+    tokens = ''.join(lines).split()
+    codes = numpy.array(list(map(TOKENS.get, tokens, itertools.repeat(-1))), dtype = numpy.intp)
+    lengths = numpy.fromiter(map(len, map(str.split, lines)), dtype = numpy.intp,
+                             count = len(lines))
+    starts = numpy.cumsum(lengths) - lengths
+    strengths = numpy.full(len(lines), -1, dtype = numpy.int64)
+    for num_cards in range(PokerHand.MIN_NUM_CARDS, PokerHand.MAX_NUM_CARDS + 1):
+        rows = numpy.flatnonzero(lengths == num_cards)
+        group = codes[starts[rows, None] + numpy.arange(num_cards)]
+
+        # a hand is valid if every token is a card and no card is repeated, i.e. the sorted codes
+        # are not negative and differ from their neighbors
+        group.sort(axis = 1)
+        valid = (group[:, 0] >= 0) & (group[:, 1:] != group[:, :-1]).all(axis = 1)
+        strengths[rows[valid]] = poker_eval.evaluate_batch(group[valid])
+
+    return strengths.tolist()
+
+BATCH_SIZE = 1 << 16 # default number of lines per batch of evaluate_file()
+_BUFFER_SIZE = 1 << 20 # size of the I/O buffers of the files of evaluate_file()
+
+# output format -> header, row format with the strength as argument per hand type, invalid row
+_FORMATS = {'csv': ("type,strength,label\n",
+                    [f"{htype},%d,{label}\n" for htype, label in enumerate(PokerHand._LABELS[:-1])],
+                    ",,invalid\n"),
+            'jsonl': ("",
+                      [f'{{"type": {htype}, "strength": %d, "label": "{label}"}}\n'
+                       for htype, label in enumerate(PokerHand._LABELS[:-1])],
+                      '{"type": null, "strength": null, "label": "invalid"}\n')}
+
+# evaluator -> function that maps card codes to a strength, None for the dict evaluator
+_EVALUATORS = {PokerHand.DICT_EVALUATOR: None,
+               PokerHand.TABLE_EVALUATOR: poker_eval.evaluate,
+               PokerHand.BITMASK_EVALUATOR: poker_eval.evaluate_masks,
+               PokerHand.CACHED_EVALUATOR: poker_eval.evaluate_cached}
+
+def _groups(strength):
+    """Decode a strength calculated by module poker_eval.
+
+    strength: int, the strength of a hand
+
+    return: tuple(int, list of tuple(int, int)), the hand type and (rank, number of cards) of every
+            distinct rank of the hand itself in order, the rank of an ace is 1
+    """
+    htype = poker_eval.hand_type(strength)
+    ranks = poker_eval.hand_ranks(strength)[:_HAND_LENGTHS[htype]]
+
+    return htype, [(rank % poker_eval.ACE or 1, ranks.count(rank)) for rank in dict.fromkeys(ranks)]
+
+# the number of cards of the hand itself for every hand type, the rest is the rest of the hand
+_HAND_LENGTHS = (1, 2, 4, 3, 5, 5, 5, 4, 5)
+
+# key function to sort cards by rank
+_RANK = operator.attrgetter('rank')
+
+# strength -> decoded strength, see _groups()
+_GROUPS = {}
 
 def _description(hand):
     """Get string description of hand.
@@ -620,35 +930,5 @@ CARD_DESC_WIDTH = len(max(Card.rank_names[1:], key = len)) + \
                   len(Card.QUALIFIER) + \
                   len(max(Card.suit_names, key = len))
 
-def _compare_eq(cards, other_cards):
-    """Iterate over the cards from different hands and compare if they have the same rank.
-
-    cards      : list of Card, list of cards of the hand
-    other_cards: list of Card, list of cards of the other hand
-
-    return: bool, True if cards from different hands have the same rank
-    """
-    for card, other_card in zip(cards, other_cards):
-        if card.rank != other_card.rank: # if card ranks are different, hands are different
-            return False
-
-    return True
-
-def _compare_lt(cards, other_cards):
-    """Compare cards from two hands based on rank and 'less than' operator.
-
-    cards      : list of Card, list of cards of one hand
-    other_cards: list of Card, list of cards of the other hand
-
-    return: None or bool, True if cards are smaller, False if greater and None if equal
-    """
-    for card, other_card in zip(cards, other_cards):
-        if card.rank != 1 and (card.rank < other_card.rank or other_card.rank == 1):
-            return True
-        if other_card.rank != 1 and (card.rank > other_card.rank or card.rank == 1):
-            return False
-
-    return None # all cards are equal
-
 if __name__ == '__main__':
     sys.exit(main())
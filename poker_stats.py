@@ -1,11 +1,17 @@
 """This program calculates the probability of poker hands by generating a large number of random
 sample hands."""
 import sys
+import math
+import pickle
 import timeit
 import argparse
+import itertools
+import concurrent.futures
 
 import utility
-from poker_hand import PokerHand, Hand, Deck, Card
+import poker_eval
+from poker_hand import PokerHand, Card
+from card import ArrayDeck, CARDS
 
 # Inherit class that provides functionality for adding two instances of the derived class and
 # reference counting as well.
@@ -15,6 +21,8 @@ class PokerStats(utility.AdderWithRefCount):
     UPDATE = 1
     APPEND = 2
     ITERATIONS = 10_000
+    CHECKPOINT_INTERVAL = 100_000 # number of iterations between checkpoints
+    CHUNK_ITERATIONS = 10_000 # number of iterations per child stream of the random number generator
     CARDS_PER_DECK = len(Card.suit_names) * len(Card.rank_names[1:])
 
     def __init__(self):
@@ -22,48 +30,213 @@ class PokerStats(utility.AdderWithRefCount):
         self.__iterations = PokerStats.ITERATIONS # number of iterations to execute
         self.__cards_per_hand = PokerHand.MAX_NUM_CARDS # number of cards in a sample hand
         self.__operation = PokerStats.UPDATE # operation to execute
+        # number of cards dealt per sample hand, more than cards per hand for prefixes()
+        self.__cards_dealt = self.__cards_per_hand
         # number of sample hands in a deck
-        self.__hands_per_deck = PokerStats.CARDS_PER_DECK // self.__cards_per_hand
+        self.__hands_per_deck = PokerStats.CARDS_PER_DECK // self.__cards_dealt
         self.__histogram = {} # contains poker hand types and their frequencies
         self.__samples = 0 # total number of sample hands generated
+        self.__exact = False # True if the histogram counts every hand, see exact()
 
-    def update(self, iterations = ITERATIONS, cards_per_hand = PokerHand.MAX_NUM_CARDS):
+    def update(self, iterations = ITERATIONS, cards_per_hand = PokerHand.MAX_NUM_CARDS, rng = None,
+               evaluator = PokerHand.DICT_EVALUATOR, workers = 1, kernel = False):
         """Generate poker hands, analyze them and store their frequencies.
 
         Clear previously generated stats if any.
 
+        The iterations are split into chunks of CHUNK_ITERATIONS iterations and every chunk draws
+        from its own child stream spawned from rng (see utility.RandomStream.spawn()). With more
+        than one worker the chunks are spread across a pool of worker processes and their stats are
+        added by _op_add(), so the stats are the same for a given seed and any number of workers.
+
         iterations    : int, the number of iterations to execute
         cards_per_hand: int, the number of cards in a generated sample hand
+        rng           : random.Random or None, the random number generator that seeds the chunks,
+                        e.g. a utility.RandomStream for reproducible stats, None uses the global
+                        random state
+        evaluator     : int, the evaluator that classifies the hands, e.g.
+                        PokerHand.CACHED_EVALUATOR, see PokerHand.classify()
+        workers       : int, the number of worker processes, 1 runs in this process
+        kernel        : bool, if True the hands are classified by the simulation kernel, which
+                        creates no objects per hand and looks the hand types up in the tables of
+                        module poker_eval, evaluator is then ignored. The stats are the same as
+                        with the evaluators for the same rng.
 
         return: bool, True if stats were updated
         """
-        return self.__generate(iterations, cards_per_hand)
+        return self.__generate(iterations, cards_per_hand, rng = rng, evaluator = evaluator,
+                               workers = workers, kernel = kernel)
 
-    def append(self, iterations = ITERATIONS, cards_per_hand = PokerHand.MAX_NUM_CARDS):
+    def append(self, iterations = ITERATIONS, cards_per_hand = PokerHand.MAX_NUM_CARDS, rng = None,
+               evaluator = PokerHand.DICT_EVALUATOR, workers = 1, kernel = False):
         """Generate poker hands, analyze them and append their frequencies to existing stats.
 
         iterations    : int, the number of iterations to execute
         cards_per_hand: int, the number of cards in a generated sample hand
+        rng           : random.Random or None, see update()
+        evaluator     : int, see update()
+        workers       : int, see update()
+        kernel        : bool, see update()
 
         return: bool, True if stats were appended
         """
-        return self.__generate(iterations, cards_per_hand, PokerStats.APPEND)
+        return self.__generate(iterations, cards_per_hand, PokerStats.APPEND, rng, evaluator,
+                               workers, kernel)
 
     def print(self, operation = NONE, iterations = ITERATIONS,
-              cards_per_hand = PokerHand.MAX_NUM_CARDS):
+              cards_per_hand = PokerHand.MAX_NUM_CARDS, rng = None,
+              evaluator = PokerHand.DICT_EVALUATOR, workers = 1, kernel = False):
         """Print existing or newly generated poker stats depending on the operation.
 
         operation     : int, the operation to execute, e.g. 'NONE' will print existing stats
         iterations    : int, the number of iterations to execute
         cards_per_hand: int, the number of cards in a generated sample hand
+        rng           : random.Random or None, see update()
+        evaluator     : int, see update()
+        workers       : int, see update()
+        kernel        : bool, see update()
 
         return: bool, True if no error occured
         """
-        generate = self.__generate(iterations, cards_per_hand, operation)
+        generate = self.__generate(iterations, cards_per_hand, operation, rng, evaluator, workers,
+                                   kernel)
         print(self)
 
         return generate
 
+    def checkpointed(self, filename, iterations = ITERATIONS,
+                     cards_per_hand = PokerHand.MAX_NUM_CARDS, rng = None,
+                     evaluator = PokerHand.DICT_EVALUATOR, workers = 1, kernel = False,
+                     interval = CHECKPOINT_INTERVAL):
+        """Generate poker hands like update() and write a checkpoint every interval iterations.
+
+        The checkpoint holds the parameters, the number of iterations done, the histogram, the
+        number of samples and the state of the random number generator and is written atomically
+        (see utility.atomic_write()), so a killed run loses at most one interval and resume()
+        continues it with the same random numbers as if it had not been killed.
+
+        filename      : str, the checkpoint file
+        iterations    : int, the number of iterations to execute
+        cards_per_hand: int, the number of cards in a generated sample hand
+        rng           : random.Random or None, see update(), None starts a utility.RandomStream
+                        seeded from the global random state, as the random module can't be saved
+        evaluator     : int, see update()
+        workers       : int, see update()
+        kernel        : bool, see update()
+        interval      : int, the number of iterations between checkpoints
+
+        return: bool, True if stats were generated
+
+        exceptions: OSError, if the checkpoint can't be written, the first checkpoint is written
+                    before any hand is generated
+        """
+        if not isinstance(interval, int) or interval < 1:
+            print(f"error: 'interval' = '{interval}' must be an integer > 0")
+            return False
+        if _param_error(iterations, cards_per_hand, PokerStats.UPDATE):
+            return False
+
+        rng = utility.random_stream(rng)
+        if not isinstance(rng, utility.RandomStream):
+            rng = utility.RandomStream(rng.getrandbits(128))
+
+        checkpoint = {'iterations': iterations,
+                      'cards_per_hand': cards_per_hand,
+                      'evaluator': evaluator,
+                      'workers': workers,
+                      'kernel': kernel,
+                      'interval': interval,
+                      'done': 0,
+                      'histogram': {},
+                      'samples': 0,
+                      'rng': rng}
+        utility.atomic_write(filename, pickle.dumps(checkpoint))
+
+        return self.__run_checkpointed(filename, checkpoint)
+
+    def resume(self, filename):
+        """Load a checkpoint written by checkpointed() and finish its run.
+
+        filename: str, the checkpoint file
+
+        return: bool, True if stats were generated, False if the file is not a checkpoint
+
+        exceptions: OSError, if the checkpoint can't be read
+                    pickle.UnpicklingError, EOFError, ValueError, if the checkpoint is corrupt
+        """
+        with open(filename, 'rb') as file:
+            checkpoint = pickle.load(file)
+
+        if not isinstance(checkpoint, dict) or set(checkpoint) != _CHECKPOINT_KEYS:
+            print(f"error: '{filename}' is not a checkpoint of {self.__class__.__name__}")
+            return False
+
+        return self.__run_checkpointed(filename, checkpoint)
+
+    @classmethod
+    def prefixes(cls, iterations = ITERATIONS, rng = None):
+        """Deal hands of 7 cards and classify their first 5, 6 and 7 cards, so that every shuffled
+        deck gives sample hands of the three sizes.
+
+        The hands are classified like the simulation kernel (see update()) and incrementally: the
+        prime product and the suit counts of the first 5 cards are extended by the 6th and then by
+        the 7th card. The 7-card stats are the same as update(iterations, 7, rng, kernel = True)
+        for the same rng. The 5 and 6-card stats have 7 hands per deck instead of 10 and 8.
+
+        iterations: int, the number of iterations to execute
+        rng       : random.Random or None, see update()
+
+        return: dict(int, PokerStats) or None if there's a parameter error, the stats per number of
+                cards per hand
+        """
+        if _param_error(iterations, PokerHand.MAX_NUM_CARDS, PokerStats.UPDATE):
+            return None
+
+        histograms = [[0] * (PokerHand.STRAIGHT_FLUSH + 1)
+                      for size in range(PokerHand.MIN_NUM_CARDS, PokerHand.MAX_NUM_CARDS + 1)]
+        for chunk_iterations, stream in _chunks(iterations, rng):
+            for histogram, chunk_histogram in zip(histograms,
+                                                  _prefix_kernel(chunk_iterations, stream)):
+                for htype, freq in enumerate(chunk_histogram):
+                    histogram[htype] += freq
+        stats = {}
+        for cards_per_hand, histogram in zip(range(PokerHand.MIN_NUM_CARDS,
+                                                   PokerHand.MAX_NUM_CARDS + 1), histograms):
+            pstats = cls()
+            pstats.__set(iterations, cards_per_hand, PokerStats.UPDATE)
+            pstats.__cards_dealt = PokerHand.MAX_NUM_CARDS
+            pstats.__hands_per_deck = PokerStats.CARDS_PER_DECK // pstats.__cards_dealt
+            pstats.__histogram.update((htype, freq) for htype, freq in enumerate(histogram) if freq)
+            pstats.__samples = iterations * pstats.__hands_per_deck
+            stats[cards_per_hand] = pstats
+
+        return stats
+
+    def exact(self, cards_per_hand = PokerHand.MAX_NUM_CARDS):
+        """Count every poker hand of a number of cards instead of generating sample hands.
+
+        Clear previously generated stats if any.
+
+        Instead of the C(52, cards_per_hand) hands, e.g. 133,784,560 of 7 cards, the multisets of
+        ranks are enumerated, 49,205 of 7 ranks, and weighted by the number of ways to assign suits
+        to them. The flushes are counted per suit from the ranks of the flush and the ranks of the
+        other cards and moved from the hand type of their ranks to their flush type. The hand types
+        are looked up in the tables of module poker_eval.
+
+        cards_per_hand: int, the number of cards in a hand
+
+        return: bool, True if stats were calculated
+        """
+        if not self.__set(self.__iterations, cards_per_hand, PokerStats.UPDATE):
+            return False
+
+        self.__clear()
+        self.__histogram.update(_exact_histogram(self.__cards_per_hand))
+        self.__samples = math.comb(PokerStats.CARDS_PER_DECK, self.__cards_per_hand)
+        self.__exact = True
+
+        return True
+
     def clear(self):
         """Clear all poker stats."""
         self.__set(PokerStats.ITERATIONS, PokerHand.MAX_NUM_CARDS, PokerStats.UPDATE)
@@ -78,11 +251,21 @@ class PokerStats(utility.AdderWithRefCount):
         """return: int, number of cards per hand"""
         return self.__cards_per_hand
 
+    @property
+    def cards_dealt(self):
+        """return: int, number of cards dealt per hand, see prefixes()"""
+        return self.__cards_dealt
+
     @property
     def operation(self):
         """return: int, the operation type"""
         return self.__operation
 
+    @property
+    def is_exact(self):
+        """return: bool, True if the histogram counts every hand, see exact()"""
+        return self.__exact
+
     @property
     def histogram(self):
         """return: dict(int, int), key: hand type, value: frequency"""
@@ -123,9 +306,10 @@ class PokerStats(utility.AdderWithRefCount):
         return f"<type: {self.__class__.__module__}.{self.__class__.__name__},"\
                f" id: {id(self)}>"
 
-    def __call__(self, iterations = ITERATIONS, cards_per_hand = PokerHand.MAX_NUM_CARDS):
+    def __call__(self, iterations = ITERATIONS, cards_per_hand = PokerHand.MAX_NUM_CARDS,
+                 rng = None, evaluator = PokerHand.DICT_EVALUATOR, workers = 1, kernel = False):
         """See doc of returned method."""
-        return self.update(iterations, cards_per_hand)
+        return self.update(iterations, cards_per_hand, rng, evaluator, workers, kernel)
 
     def __bool__(self):
         """Called when a poker stats object is used as a boolean in an expression.
@@ -185,7 +369,9 @@ class PokerStats(utility.AdderWithRefCount):
         """
         return self.__iterations == other.iterations and \
                self.__cards_per_hand == other.cards_per_hand and \
-               self.__operation == other.operation
+               self.__cards_dealt == other.cards_dealt and \
+               self.__operation == other.operation and \
+               self.__exact == other.is_exact
 
     def _op_add(self, other):
         """Add a poker stats object to this one.
@@ -197,41 +383,163 @@ class PokerStats(utility.AdderWithRefCount):
             self.__histogram[htype] += freq
         self.__samples += len(other)
 
-    def __generate(self, iterations, cards_per_hand, operation = UPDATE):
+    @classmethod
+    def _from_chunk(cls, iterations, cards_per_hand, rng, evaluator, kernel):
+        """Generate the poker stats of a chunk of iterations, see _chunks().
+
+        The hands are generated like by the chunks of update() in this process, so the stats of
+        the chunks add up to the same stats.
+
+        iterations    : int, the number of iterations of the chunk
+        cards_per_hand: int, the number of cards in a generated sample hand
+        rng           : utility.RandomStream, the child stream of the chunk
+        evaluator     : int, the evaluator that classifies the hands
+        kernel        : bool, True to classify the hands by the simulation kernel
+
+        return: PokerStats, the stats of the chunk
+        """
+        pstats = cls()
+        pstats.__set(iterations, cards_per_hand, PokerStats.UPDATE)
+        if kernel:
+            pstats.__simulate_kernel(iterations, rng)
+        else:
+            pstats.__simulate(iterations, rng, evaluator)
+
+        return pstats
+
+    def __generate(self, iterations, cards_per_hand, operation = UPDATE, rng = None,
+                   evaluator = PokerHand.DICT_EVALUATOR, workers = 1, kernel = False):
         """Generate poker hands, analyze them and store their frequencies.
 
         iterations    : int, the number of iterations to execute
         cards_per_hand: int, the number of cards in a generated sample hand
         operation     : int, the operation to execute, e.g. 'UPDATE' will generate new stats
+        rng           : random.Random or None, the random number generator
+        evaluator     : int, the evaluator that classifies the hands
+        workers       : int, the number of worker processes
+        kernel        : bool, True to classify the hands by the simulation kernel
 
         return: bool, True if no parameter error
         """
+        if evaluator not in range(PokerHand.DICT_EVALUATOR, PokerHand.CACHED_EVALUATOR + 1):
+            print(f"error: 'evaluator' = '{evaluator}' must be within "
+                  f"[{PokerHand.DICT_EVALUATOR}, {PokerHand.CACHED_EVALUATOR}]")
+            return False
+        if not isinstance(workers, int) or workers < 1:
+            print(f"error: 'workers' = '{workers}' must be an integer > 0")
+            return False
+        if not isinstance(kernel, bool):
+            print(f"error: 'kernel' = '{kernel}' must be of type 'bool'")
+            return False
+
         if operation: # in case it's called by print() with operation = NONE
             # check and store new parameters
             if self.__set(iterations, cards_per_hand, operation):
-                deck = Deck()
-                hand = PokerHand()
-                for i in range(self.__iterations):
-                    deck.shuffle()
-                    for j in range(self.__hands_per_deck): # iterate over number of hands in a deck
-                        deck.move_cards(hand, self.__cards_per_hand) # add cards to sample hand
+                chunks = _chunks(self.__iterations, rng)
+                if workers > 1:
+                    self.__parallel(workers, chunks, evaluator, kernel)
+                else:
+                    for chunk_iterations, stream in chunks:
+                        if kernel:
+                            self.__simulate_kernel(chunk_iterations, stream)
+                        else:
+                            self.__simulate(chunk_iterations, stream, evaluator)
 
-                        # classify the hand and use False to enable performance optimizations
-                        current_hand = hand.classify(normal_flow = False)
-                        if current_hand: # if it's a valid hand
-                            htype = current_hand[0] # get hand type
-                            self.__histogram.setdefault(htype, 0) # add to the hand type histogram
-                            self.__histogram[htype] += 1 # increment hand type frequency
+                return True
+            return False
+        return True
+
+    def __simulate(self, iterations, rng, evaluator):
+        """Generate poker hands in this process and add their frequencies.
+
+        iterations: int, the number of iterations to execute
+        rng       : random.Random or the random module, the random number generator
+        evaluator : int, the evaluator that classifies the hands
+        """
+        deck = ArrayDeck()
+        hand = PokerHand()
+        for i in range(iterations):
+            # shuffling also puts back the cards dealt in the last iteration
+            deck.shuffle(rng)
+
+            # deal all hands of a deck at once as slices of card codes
+            for codes in deck.deal(self.__hands_per_deck, self.__cards_per_hand):
+                hand.cards = [CARDS[code] for code in codes] # set cards of sample hand
+
+                # classify the hand and use False to enable performance optimizations
+                current_hand = hand.classify(normal_flow = False, evaluator = evaluator)
+                if current_hand: # if it's a valid hand
+                    htype = current_hand[0] # get hand type
+                    self.__histogram.setdefault(htype, 0) # add to the hand type histogram
+                    self.__histogram[htype] += 1 # increment hand type frequency
+
+        self.__samples += iterations * self.__hands_per_deck
+
+    def __simulate_kernel(self, iterations, rng):
+        """Generate poker hands in this process with the simulation kernel and add their
+        frequencies.
+
+        iterations: int, the number of iterations to execute
+        rng       : random.Random or the random module, the random number generator
+        """
+        histogram = _kernel(iterations, self.__cards_per_hand, self.__hands_per_deck, rng)
+        for htype, freq in enumerate(histogram):
+            if freq:
+                self.__histogram[htype] = self.__histogram.get(htype, 0) + freq
 
-                        Hand.__init__(hand) # reset base class data attributes
-                    deck.__init__() # reset deck data attributes
+        self.__samples += iterations * self.__hands_per_deck
 
-                self.__samples += self.__iterations * self.__hands_per_deck
+    def __run_checkpointed(self, filename, checkpoint):
+        """Restore the stats of a checkpoint and generate the remaining iterations interval by
+        interval, writing the checkpoint after every interval.
 
-                return True
+        filename  : str, the checkpoint file
+        checkpoint: dict, the checkpoint, see checkpointed()
+
+        return: bool, True if no parameter error
+        """
+        if not self.__set(self.__iterations, checkpoint['cards_per_hand'], PokerStats.UPDATE):
             return False
+        self.__clear()
+        self.__histogram.update(checkpoint['histogram'])
+        self.__samples = checkpoint['samples']
+
+        while checkpoint['done'] < checkpoint['iterations']:
+            block = min(checkpoint['interval'], checkpoint['iterations'] - checkpoint['done'])
+            if not self.__generate(block, checkpoint['cards_per_hand'], PokerStats.APPEND,
+                                   checkpoint['rng'], checkpoint['evaluator'],
+                                   checkpoint['workers'], checkpoint['kernel']):
+                return False
+
+            checkpoint['done'] += block
+            checkpoint['histogram'] = dict(self.__histogram)
+            checkpoint['samples'] = self.__samples
+            utility.atomic_write(filename, pickle.dumps(checkpoint))
+
         return True
 
+    def __parallel(self, workers, chunks, evaluator, kernel):
+        """Spread the chunks of iterations across worker processes and add the stats of every
+        chunk.
+
+        workers  : int, the number of worker processes, > 1
+        chunks   : list of tuple(int, utility.RandomStream), the chunks, see _chunks()
+        evaluator: int, the evaluator that classifies the hands
+        kernel   : bool, True to classify the hands by the simulation kernel
+        """
+        workers = min(workers, len(chunks))
+        iterations, streams = zip(*chunks)
+        if kernel:
+            poker_eval.type_tables() # once, instead of in every worker process
+        elif evaluator != PokerHand.DICT_EVALUATOR:
+            poker_eval.load_tables() # once, instead of in every worker process
+
+        with concurrent.futures.ProcessPoolExecutor(workers) as pool:
+            for stats in pool.map(_worker, iterations, [self.__cards_per_hand] * len(chunks),
+                                  streams, [evaluator] * len(chunks), [kernel] * len(chunks),
+                                  chunksize = math.ceil(len(chunks) / workers)):
+                self._op_add(stats)
+
     def __set(self, iterations, cards_per_hand, operation):
         """Set data attributes.
 
@@ -241,6 +549,10 @@ class PokerStats(utility.AdderWithRefCount):
 
         return: bool, True if no parameter error
         """
+        if operation == PokerStats.APPEND and self.__cards_dealt != self.__cards_per_hand:
+            print("append error: sample hands can't be appended to the stats of prefixes")
+            return False
+
         if self.__iterations != iterations or \
            self.__cards_per_hand != cards_per_hand or \
            self.__operation != operation:
@@ -260,7 +572,12 @@ class PokerStats(utility.AdderWithRefCount):
             self.__cards_per_hand = cards_per_hand
             self.__operation = operation
             # number of sample hands in a deck
-            self.__hands_per_deck = PokerStats.CARDS_PER_DECK // self.__cards_per_hand
+            self.__cards_dealt = self.__cards_per_hand
+            self.__hands_per_deck = PokerStats.CARDS_PER_DECK // self.__cards_dealt
+
+        if operation == PokerStats.APPEND and self.__exact:
+            print("append error: sample hands can't be appended to the exact stats")
+            return False
 
         # clear stats if stats exist and update was requested
         if self.__samples and self.__operation == PokerStats.UPDATE:
@@ -272,6 +589,9 @@ class PokerStats(utility.AdderWithRefCount):
         """Clear poker stats for an update."""
         self.__histogram.clear()
         self.__samples = 0
+        self.__exact = False
+        self.__cards_dealt = self.__cards_per_hand
+        self.__hands_per_deck = PokerStats.CARDS_PER_DECK // self.__cards_dealt
         super().clear()
 
     def __num_samples_width(self):
@@ -298,8 +618,12 @@ class PokerStats(utility.AdderWithRefCount):
         str_width = len(common_header) # width of longest string
         common_header = f"{common_header} = {self.__cards_per_hand}\n" \
                         f"{'hands per deck':{str_width}} = {self.__hands_per_deck:<{int_width}}, "\
-                        f"({PokerStats.CARDS_PER_DECK} / {self.__cards_per_hand} = " \
-                        "cards per deck / cards per hand)\n"
+                        f"({PokerStats.CARDS_PER_DECK} / {self.__cards_dealt} = "
+        if self.__cards_dealt == self.__cards_per_hand:
+            common_header += "cards per deck / cards per hand)\n"
+        else:
+            common_header += "cards per deck / cards dealt per hand, the first " \
+                             f"{self.__cards_per_hand} cards make the hand)\n"
 
         return common_header, str_width
 
@@ -311,6 +635,11 @@ class PokerStats(utility.AdderWithRefCount):
 
         return: str, the stats header
         """
+        if self.__exact:
+            return f"{common_header}" \
+                   f"{'samples':{width}} = {self.__samples:,}, " \
+                   f"(every hand of {self.__cards_per_hand} cards)\n\n"
+
         # self.__iterations is NOT equal to total iterations
         total_iterations = self.__samples // self.__hands_per_deck
 
@@ -334,6 +663,10 @@ class PokerStats(utility.AdderWithRefCount):
                f"{'operation':{width}} = " \
                f"{'UPDATE' if self.__operation == PokerStats.UPDATE else 'APPEND'}\n"
 
+# the keys of a checkpoint, see PokerStats.checkpointed()
+_CHECKPOINT_KEYS = {'iterations', 'cards_per_hand', 'evaluator', 'workers', 'kernel', 'interval',
+                    'done', 'histogram', 'samples', 'rng'}
+
 _DESC = f"""\
 Calculate poker statistics by generating random poker hands and classifying them.
 
@@ -365,6 +698,34 @@ def main():
     parser.add_argument('-r', '--repeat', type = int, default = 1,
                         help = "the number of times to repeat the iterations; "
                                "used for performance testing only (default: 1)")
+    parser.add_argument('-s', '--seed', type = int,
+                        help = "the master seed for reproducible stats (default: random)")
+    parser.add_argument('-k', '--kernel', action = 'store_true',
+                        help = "classify the hands by the simulation kernel, which ignores the "
+                               "evaluator")
+    parser.add_argument('--checkpoint',
+                        help = "write a checkpoint to this file every --interval iterations")
+    parser.add_argument('--interval', type = int, default = PokerStats.CHECKPOINT_INTERVAL,
+                        help = "the number of iterations between checkpoints "
+                               f"(default: {PokerStats.CHECKPOINT_INTERVAL:,})")
+    parser.add_argument('--resume',
+                        help = "finish the run of a checkpoint file, the other parameters are "
+                               "read from it")
+    parser.add_argument('-p', '--prefixes', action = 'store_true',
+                        help = f"deal {PokerHand.MAX_NUM_CARDS} cards per hand and print the stats "
+                               f"of their first {PokerHand.MIN_NUM_CARDS} to "
+                               f"{PokerHand.MAX_NUM_CARDS} cards")
+    parser.add_argument('-x', '--exact', action = 'store_true',
+                        help = "count every hand instead of generating sample hands")
+    parser.add_argument('-w', '--workers', type = int, default = 1,
+                        help = "the number of worker processes (default: 1)")
+    parser.add_argument('-e', '--evaluator', type = int, default = PokerHand.DICT_EVALUATOR,
+                        choices = range(PokerHand.DICT_EVALUATOR, PokerHand.CACHED_EVALUATOR + 1),
+                        help = f"the hand evaluator: {PokerHand.DICT_EVALUATOR} (dict), "
+                               f"{PokerHand.TABLE_EVALUATOR} (lookup tables), "
+                               f"{PokerHand.BITMASK_EVALUATOR} (bitmasks), "
+                               f"{PokerHand.CACHED_EVALUATOR} (cached lookup tables) "
+                               f"(default: {PokerHand.DICT_EVALUATOR})")
     args  = parser.parse_args()
 
     # check integer command line parameters
@@ -375,12 +736,45 @@ def main():
                  f"[{PokerHand.MIN_NUM_CARDS}, {PokerHand.MAX_NUM_CARDS}]")
     if args.repeat < 1:
         sys.exit("error: 'repeat' must be integer > 0")
-
-    if args.repeat > 1:
+    if args.workers < 1:
+        sys.exit("error: 'workers' must be integer > 0")
+
+    if args.prefixes:
+        stats = PokerStats.prefixes(args.iterations,
+                                    None if args.seed is None else utility.RandomStream(args.seed))
+        print('\n'.join(str(pstats) for pstats in stats.values()))
+    elif args.resume:
+        pstats = PokerStats()
+        try:
+            if not pstats.resume(args.resume):
+                return 1
+        except (OSError, pickle.UnpicklingError, EOFError, ValueError, KeyError) as exc:
+            sys.exit(f"error: can't resume from {args.resume!r}: {exc}")
+        print(pstats)
+    elif args.checkpoint:
+        pstats = PokerStats()
+        try:
+            if not pstats.checkpointed(args.checkpoint, args.iterations, args.cards,
+                                       None if args.seed is None else
+                                       utility.RandomStream(args.seed),
+                                       args.evaluator, args.workers, args.kernel, args.interval):
+                return 1
+        except OSError as exc:
+            sys.exit(f"error: can't write the checkpoint {args.checkpoint!r}: {exc}")
+        print(pstats)
+    elif args.exact:
+        pstats = PokerStats()
+        pstats.exact(args.cards)
+        print(pstats)
+    elif args.repeat > 1:
         custom_namespace = {'test_perf':_perf_test,
                             'iterations':args.iterations,
-                            'cards_per_hand':args.cards}
-        duration = timeit.timeit(stmt = 'test_perf(iterations, cards_per_hand)',
+                            'cards_per_hand':args.cards,
+                            'evaluator':args.evaluator,
+                            'workers':args.workers,
+                            'kernel':args.kernel}
+        duration = timeit.timeit(stmt = 'test_perf(iterations, cards_per_hand, evaluator, workers, '
+                                        'kernel)',
                                  number = args.repeat,
                                  globals = custom_namespace)
 
@@ -396,20 +790,213 @@ def main():
         #                         number = args.repeat,
         #                         globals = custom_namespace2)
 
-        print(f'On average it took {duration} seconds.')
+        duration /= args.repeat
+        hands = args.iterations * (PokerStats.CARDS_PER_DECK // args.cards)
+        print(f'On average it took {duration} seconds, {hands / duration:,.0f} hands/sec.')
     else:
         pstats = PokerStats()
-        pstats(args.iterations, args.cards)
+        pstats(args.iterations, args.cards,
+               None if args.seed is None else utility.RandomStream(args.seed), args.evaluator,
+               args.workers, args.kernel)
         print(pstats)
 
     return 0
 
-def _perf_test(iterations, cards_per_hand):
+def _perf_test(iterations, cards_per_hand, evaluator, workers, kernel):
     """Wrapper function used for testing."""
     pstats = PokerStats()
-    pstats(iterations, cards_per_hand)
+    pstats(iterations, cards_per_hand, evaluator = evaluator, workers = workers, kernel = kernel)
     print(pstats)
 
+def _exact_histogram(cards_per_hand):
+    """Count the hands of every hand type, see PokerStats.exact().
+
+    cards_per_hand: int, the number of cards in a hand
+
+    return: dict(int, int), key: hand type, value: number of hands
+    """
+    histogram = {}
+    def add(strength, ways):
+        htype = poker_eval.hand_type(strength)
+        histogram[htype] = histogram.get(htype, 0) + ways
+
+    num_suits = len(Card.suit_names)
+    rank_codes = range(PokerStats.CARDS_PER_DECK // num_suits) # the codes of the ranks of a suit
+
+    # every multiset of ranks as if no hand was a flush
+    for product, ways in _rank_multisets(cards_per_hand, num_suits):
+        add(poker_eval.rank_strength(product), ways)
+
+    # a flush has 5 or more ranks of a suit, the other cards are of the other suits
+    for num_flush in range(poker_eval.MIN_NUM_CARDS, cards_per_hand + 1):
+        others = list(_rank_multisets(cards_per_hand - num_flush, num_suits - 1))
+        for flush in itertools.combinations(rank_codes, num_flush):
+            mask = sum(poker_eval.BITS[code] for code in flush)
+            flush_product = math.prod(poker_eval.PRIMES[code] for code in flush)
+            flush_strength = poker_eval.suit_strength(mask)
+            for product, ways in others:
+                ways *= num_suits # the suit of the flush
+                add(poker_eval.rank_strength(flush_product * product), -ways)
+                add(flush_strength, ways)
+
+    return {htype: freq for htype, freq in histogram.items() if freq}
+
+def _rank_multisets(num, num_suits, first = 0):
+    """Enumerate the multisets of ranks with at most num_suits cards per rank.
+
+    num      : int, the number of cards
+    num_suits: int, the number of suits to choose the cards of a rank from
+    first    : int, the code of the lowest rank that can be used (see card.Card.code of a club)
+
+    return: generator of tuple(int, int), the product of the primes of the ranks (see
+            poker_eval.PRIMES) and the number of ways to choose the suits of the cards
+    """
+    if num == 0:
+        yield 1, 1
+        return
+
+    for code in range(first, PokerStats.CARDS_PER_DECK // len(Card.suit_names)):
+        for count in range(1, min(num, num_suits) + 1):
+            prime, ways = poker_eval.PRIMES[code] ** count, math.comb(num_suits, count)
+            for product, rest_ways in _rank_multisets(num - count, num_suits, code + 1):
+                yield prime * product, ways * rest_ways
+
+def _kernel(iterations, cards_per_hand, hands_per_deck, rng):
+    """Generate and classify poker hands without creating objects per hand.
+
+    The deck is a bytearray of card codes that is shuffled in place like card.ArrayDeck, so the
+    hands are the same as with PokerStats.__simulate() for the same rng. The cards of a hand are
+    read from their slice of the deck by index, the prime product of their ranks and the number
+    of cards per suit, packed in 4 bits per suit, are accumulated in ints and the hand type is
+    looked up in poker_eval.type_tables(). Only a flush (a suit with 5 cards or more) needs the
+    rank mask of its suit.
+
+    iterations    : int, the number of iterations, i.e. shuffled decks
+    cards_per_hand: int, the number of cards in a hand
+    hands_per_deck: int, the number of hands dealt from a deck
+    rng           : random.Random or the random module, the random number generator
+
+    return: list of int, the frequency of every hand type, indexed by hand type
+    """
+    product_types, flush_types = poker_eval.type_tables()
+    primes, bits, suits = poker_eval.PRIMES, poker_eval.BITS, poker_eval.SUITS
+    suit_counts = _SUIT_COUNTS
+    shuffle = rng.shuffle
+
+    deck = bytearray(range(PokerStats.CARDS_PER_DECK))
+    histogram = [0] * (PokerHand.STRAIGHT_FLUSH + 1) # one frequency per hand type
+    ends = range(cards_per_hand, hands_per_deck * cards_per_hand + 1, cards_per_hand)
+    for i in range(iterations):
+        shuffle(deck)
+        for end in ends:
+            product = 1
+            counts = 0
+            for index in range(end - cards_per_hand, end):
+                code = deck[index]
+                product *= primes[code]
+                counts += suit_counts[code]
+
+            flush = (counts + _FLUSH_CARRY) & _FLUSH_BITS
+            if flush:
+                suit = flush.bit_length() // _SUIT_COUNT_BITS - 1
+                mask = 0
+                for index in range(end - cards_per_hand, end):
+                    code = deck[index]
+                    if suits[code] == suit:
+                        mask |= bits[code]
+                histogram[flush_types[mask]] += 1
+            else:
+                histogram[product_types[product]] += 1
+
+    return histogram
+
+def _prefix_kernel(iterations, rng):
+    """Generate hands of 7 cards and classify their first 5, 6 and 7 cards, see _kernel().
+
+    iterations: int, the number of iterations, i.e. shuffled decks
+    rng       : random.Random or the random module, the random number generator
+
+    return: list of list of int, the frequency of every hand type of the 5, 6 and 7-card hands
+    """
+    product_types, flush_types = poker_eval.type_tables()
+    primes, bits, suits = poker_eval.PRIMES, poker_eval.BITS, poker_eval.SUITS
+    suit_counts = _SUIT_COUNTS
+    shuffle = rng.shuffle
+
+    deck = bytearray(range(PokerStats.CARDS_PER_DECK))
+    histograms = [[0] * (PokerHand.STRAIGHT_FLUSH + 1)
+                  for size in range(PokerHand.MIN_NUM_CARDS, PokerHand.MAX_NUM_CARDS + 1)]
+    num_cards = PokerHand.MAX_NUM_CARDS
+    starts = range(0, PokerStats.CARDS_PER_DECK // num_cards * num_cards, num_cards)
+    for i in range(iterations):
+        shuffle(deck)
+        for start in starts:
+            product = 1
+            counts = 0
+            for index in range(start, start + PokerHand.MIN_NUM_CARDS - 1):
+                code = deck[index]
+                product *= primes[code]
+                counts += suit_counts[code]
+
+            # add the 5th, 6th and 7th card and classify the hand after each of them
+            for histogram, end in zip(histograms, range(start + PokerHand.MIN_NUM_CARDS,
+                                                         start + num_cards + 1)):
+                code = deck[end - 1]
+                product *= primes[code]
+                counts += suit_counts[code]
+
+                flush = (counts + _FLUSH_CARRY) & _FLUSH_BITS
+                if flush:
+                    suit = flush.bit_length() // _SUIT_COUNT_BITS - 1
+                    mask = 0
+                    for index in range(start, end):
+                        code = deck[index]
+                        if suits[code] == suit:
+                            mask |= bits[code]
+                    histogram[flush_types[mask]] += 1
+                else:
+                    histogram[product_types[product]] += 1
+
+    return histograms
+
+# The number of cards per suit of a hand is packed in an int, 4 bits per suit. Adding 3 to every
+# count carries into the top bit of the suit with 5 cards or more (at most 7 + 3 < 16).
+_SUIT_COUNT_BITS = 4
+_SUIT_COUNTS = tuple(1 << _SUIT_COUNT_BITS * suit for suit in poker_eval.SUITS)
+_FLUSH_CARRY = sum(3 << _SUIT_COUNT_BITS * suit for suit in range(len(Card.suit_names)))
+_FLUSH_BITS = sum(8 << _SUIT_COUNT_BITS * suit for suit in range(len(Card.suit_names)))
+
+def _chunks(iterations, rng):
+    """Split iterations into chunks of PokerStats.CHUNK_ITERATIONS, each with its own child stream.
+
+    iterations: int, the number of iterations
+    rng       : random.Random or None, the random number generator that seeds the child streams,
+                if it's not a utility.RandomStream a root stream is seeded from it
+
+    return: list of tuple(int, utility.RandomStream), the number of iterations and the child
+            stream of every chunk
+    """
+    rng = utility.random_stream(rng)
+    if not isinstance(rng, utility.RandomStream):
+        rng = utility.RandomStream(rng.getrandbits(128))
+    sizes = [min(PokerStats.CHUNK_ITERATIONS, iterations - start)
+             for start in range(0, iterations, PokerStats.CHUNK_ITERATIONS)]
+
+    return list(zip(sizes, rng.spawn(len(sizes))))
+
+def _worker(iterations, cards_per_hand, rng, evaluator, kernel):
+    """Generate poker stats of a chunk in a worker process, see PokerStats.update().
+
+    iterations    : int, the number of iterations to execute
+    cards_per_hand: int, the number of cards in a generated sample hand
+    rng           : utility.RandomStream, the child stream of the chunk
+    evaluator     : int, the evaluator that classifies the hands
+    kernel        : bool, True to classify the hands by the simulation kernel
+
+    return: PokerStats, the stats of the chunk
+    """
+    return PokerStats._from_chunk(iterations, cards_per_hand, rng, evaluator, kernel)
+
 def _param_error(iterations, cards_per_hand, operation):
     """Validate parameters.
 
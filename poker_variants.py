@@ -0,0 +1,214 @@
+"""This module evaluates the hands of the poker variants Texas hold'em and Omaha. The cards are card
+codes (see card.Card.code) and a hand is evaluated to the same strength as poker_hand.PokerHand, so
+hands of different players are compared as ints.
+
+Texas hold'em: a player has 2 hole cards and the best 5 of the hole cards and the board count.
+
+Omaha: a player has 4 hole cards and exactly 2 hole cards and 3 board cards are used, i.e. out of
+6 pairs of hole cards and 10 triples of board cards (5 board cards) there are 60 hands to evaluate.
+Instead, the structure of the board is computed once (see Board) and used to skip hands:
+
+- a flush needs 3 board cards and 2 hole cards of the same suit, so flushes are only evaluated for
+  the suits of the board that have 3 cards or more (flush suits) and the hole pairs of such a suit
+- the hands that are not flushes depend only on the ranks, so every distinct product of ranks of
+  the board triples is combined with every distinct product of ranks of the hole pairs
+- a full house or four of a kind needs a paired board, so if there's a flush and the board is not
+  paired, no other hand can beat it
+"""
+import sys
+import random
+import argparse
+import itertools
+
+import utility
+import poker_eval
+
+HOLDEM_HOLE_CARDS = 2 # number of hole cards in Texas hold'em
+OMAHA_HOLE_CARDS = 4 # number of hole cards in Omaha
+OMAHA_HOLE_USED = 2 # number of hole cards of a hand in Omaha
+OMAHA_BOARD_USED = 3 # number of board cards of a hand in Omaha
+MIN_BOARD_CARDS = 3 # number of board cards on the flop
+MAX_BOARD_CARDS = 5 # number of board cards on the river
+
+class Board:
+    """The structure of the board, computed once and shared by the hands of all players.
+
+    Attributes:
+      codes: tuple of int, the card codes of the board
+      paired: bool, True if two board cards have the same rank
+      products: set of int, the distinct rank products (see poker_eval.PRIMES) of the board triples
+      flush_masks: dict(int, set of int), the distinct rank masks of the board triples of a single
+                   suit per flush suit, i.e. a suit with 3 board cards or more
+    """
+    __slots__ = ('codes', 'paired', 'products', 'flush_masks')
+
+    def __init__(self, codes):
+        """ctor
+
+        codes: sequence of int, 3 to 5 distinct card codes
+
+        exceptions: ValueError, if codes are not 3 to 5 distinct card codes
+        """
+        self.codes = _codes(codes, MIN_BOARD_CARDS, MAX_BOARD_CARDS, 'board')
+
+        ranks = [poker_eval.RANKS[code] for code in self.codes]
+        self.paired = len(set(ranks)) < len(ranks)
+
+        self.products = set()
+        self.flush_masks = {}
+        for triple in itertools.combinations(self.codes, OMAHA_BOARD_USED):
+            first, second, third = triple
+            self.products.add(poker_eval.PRIMES[first] * poker_eval.PRIMES[second] *
+                              poker_eval.PRIMES[third])
+            suit = poker_eval.SUITS[first]
+            if suit == poker_eval.SUITS[second] == poker_eval.SUITS[third]:
+                self.flush_masks.setdefault(suit, set()).add(poker_eval.BITS[first] |
+                                                             poker_eval.BITS[second] |
+                                                             poker_eval.BITS[third])
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({self.codes!r})"
+
+def holdem(hole, board):
+    """Evaluate a Texas hold'em hand, the best 5 of the hole cards and the board cards.
+
+    hole : sequence of int, the 2 hole card codes
+    board: Board or sequence of int, the 3 to 5 board card codes
+
+    return: int, the strength of the hand
+
+    exceptions: ValueError, if the cards are not valid
+    """
+    board = board if isinstance(board, Board) else Board(board)
+    hole = _codes(hole, HOLDEM_HOLE_CARDS, HOLDEM_HOLE_CARDS, 'hole', board.codes)
+
+    return poker_eval.evaluate(hole + board.codes)
+
+def omaha(hole, board):
+    """Evaluate an Omaha hand, the best hand of exactly 2 hole cards and 3 board cards.
+
+    hole : sequence of int, the 4 hole card codes
+    board: Board or sequence of int, the 3 to 5 board card codes
+
+    return: int, the strength of the hand
+
+    exceptions: ValueError, if the cards are not valid
+    """
+    board = board if isinstance(board, Board) else Board(board)
+    hole = _codes(hole, OMAHA_HOLE_CARDS, OMAHA_HOLE_CARDS, 'hole', board.codes)
+    pairs = list(itertools.combinations(hole, OMAHA_HOLE_USED))
+
+    best = 0
+    for suit, masks in board.flush_masks.items():
+        for first, second in pairs:
+            if poker_eval.SUITS[first] == poker_eval.SUITS[second] == suit:
+                pair_mask = poker_eval.BITS[first] | poker_eval.BITS[second]
+                for mask in masks:
+                    best = max(best, poker_eval.suit_strength(pair_mask | mask))
+
+    if best and not board.paired: # only a full house or four of a kind could beat a flush
+        return best
+
+    products = {poker_eval.PRIMES[first] * poker_eval.PRIMES[second] for first, second in pairs}
+    for product in products:
+        for board_product in board.products:
+            best = max(best, poker_eval.rank_strength(product * board_product))
+
+    return best
+
+def omaha_naive(hole, board):
+    """Evaluate an Omaha hand by evaluating every combination of 2 hole cards and 3 board cards.
+
+    See omaha() for the parameters and the return value.
+    """
+    board = board if isinstance(board, Board) else Board(board)
+    hole = _codes(hole, OMAHA_HOLE_CARDS, OMAHA_HOLE_CARDS, 'hole', board.codes)
+
+    return max(poker_eval.evaluate(pair + triple)
+               for pair in itertools.combinations(hole, OMAHA_HOLE_USED)
+               for triple in itertools.combinations(board.codes, OMAHA_BOARD_USED))
+
+def verify(samples, rng = None):
+    """Check the evaluators against poker_hand.PokerHand and omaha_naive() on random deals.
+
+    samples: int, the number of random deals per number of board cards
+    rng    : random.Random or None, the random number generator
+
+    return: list of tuple(str, tuple of int, tuple of int), the variant, hole cards and board cards
+            of the deals where the evaluators disagree
+    """
+    from poker_hand import PokerHand
+    from card import CARDS
+
+    sample = (rng or random).sample
+    errors = []
+    hand = PokerHand()
+    for num_board in range(MIN_BOARD_CARDS, MAX_BOARD_CARDS + 1):
+        for i in range(samples):
+            codes = sample(range(len(CARDS)), OMAHA_HOLE_CARDS + num_board)
+            hole, board = tuple(codes[:OMAHA_HOLE_CARDS]), Board(codes[OMAHA_HOLE_CARDS:])
+
+            hand.cards = [CARDS[code] for code in hole[:HOLDEM_HOLE_CARDS] + board.codes]
+            if holdem(hole[:HOLDEM_HOLE_CARDS], board) != hand.strength:
+                errors.append(("hold'em", hole[:HOLDEM_HOLE_CARDS], board.codes))
+            if omaha(hole, board) != omaha_naive(hole, board):
+                errors.append(('omaha', hole, board.codes))
+
+    return errors
+
+def _codes(codes, min_len, max_len, name, other = ()):
+    """Validate card codes.
+
+    codes  : sequence of int, the card codes
+    min_len: int, the min number of card codes
+    max_len: int, the max number of card codes
+    name   : str, the name of the cards for error messages
+    other  : tuple of int, card codes that must not be part of codes
+
+    return: tuple of int, the card codes
+
+    exceptions: ValueError, if the card codes are not valid
+    """
+    codes = tuple(codes)
+    if not min_len <= len(codes) <= max_len or \
+       any(not 0 <= code < len(poker_eval.RANKS) for code in codes) or \
+       len(set(codes + other)) != len(codes) + len(other):
+        num = min_len if min_len == max_len else f"{min_len} to {max_len}"
+        raise ValueError(f"error: the {name} cards must be {num} distinct card codes that are not "
+                         f"used elsewhere, {codes!r}")
+
+    return codes
+
+_DESC = """\
+Check the Texas hold'em and Omaha evaluators against the classifier of module poker_hand and against
+evaluating every Omaha combination.
+"""
+
+def main():
+    """Main entry point.
+
+    return: int, success or failure
+    """
+    parser = argparse.ArgumentParser(formatter_class = argparse.RawTextHelpFormatter,
+                                     description = _DESC,
+                                     epilog = 'usage example: '
+                                              f'python {sys.argv[0]} verify -s 100000')
+    parser.add_argument('command', choices = ['verify'],
+                        help = "the command to execute")
+    parser.add_argument('-s', '--samples', type = int, default = 10_000,
+                        help = "the number of random deals per number of board cards "
+                               "(default: 10,000)")
+    parser.add_argument('--seed', type = int,
+                        help = "the master seed for reproducible samples (default: random)")
+    args = parser.parse_args()
+
+    rng = None if args.seed is None else utility.RandomStream(args.seed)
+    errors = verify(args.samples, rng)
+    for variant, hole, board in errors[:10]:
+        print(f"error: {variant} evaluators disagree on hole cards {hole} and board {board}")
+    print(f"{len(errors)} deal(s) in error")
+
+    return 1 if errors else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
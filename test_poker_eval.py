@@ -0,0 +1,45 @@
+"""Regression tests of the evaluators of module poker_eval against poker_hand.PokerHand.classify().
+
+The sampled checks run by default. The check of all 2,598,960 hands of 5 cards takes about a minute
+and runs only if the environment variable POKER_EVAL_EXHAUSTIVE is set to 1:
+
+    POKER_EVAL_EXHAUSTIVE=1 python -m unittest test_poker_eval
+"""
+import os
+import unittest
+
+import utility
+import poker_eval
+
+SAMPLES = 20_000 # number of random hands per number of cards
+SEED = 2_598_960 # master seed of the random hands
+EXHAUSTIVE = os.environ.get('POKER_EVAL_EXHAUSTIVE') == '1'
+
+class TestVerify(unittest.TestCase):
+    """Check that both evaluators agree with the classifier, see poker_eval.verify()."""
+    def check(self, num_cards, samples):
+        """Verify hands of num_cards cards and fail with the first hands in error.
+
+        num_cards: int, the number of cards per hand, 5 to 7
+        samples  : int or None, the number of random hands, None checks every hand
+        """
+        rng = utility.RandomStream(SEED, (num_cards,))
+        errors = poker_eval.verify(num_cards, samples, rng)
+        self.assertEqual(errors, [], f"{len(errors)} hand(s) of {num_cards} cards in error, "
+                                     f"first: {errors[:5]}")
+
+    def test_sampled_5_cards(self):
+        self.check(5, SAMPLES)
+
+    def test_sampled_6_cards(self):
+        self.check(6, SAMPLES)
+
+    def test_sampled_7_cards(self):
+        self.check(7, SAMPLES)
+
+    @unittest.skipUnless(EXHAUSTIVE, "set POKER_EVAL_EXHAUSTIVE=1 to check every hand of 5 cards")
+    def test_every_5_card_hand(self):
+        self.check(5, None)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -6,7 +6,8 @@ Positions are numbered from 1 to 9 and the center position is 5. The user may ch
 from 1 to 9 to place the 'O' in the desired position.
 """
 import sys
-from random import randrange
+
+import utility
 
 class TicTacToe:
     """Implements tic tac toe functionality. Computer moves are random, not based on AI."""
@@ -69,8 +70,13 @@ class TicTacToe:
                     print(row * TicTacToe.__STRIKE + col + 1, end = " ")
                 print()
 
-    def draw_move(self):
-        """Draw random move, not AI based, on behalf of the computer."""
+    def draw_move(self, rng = None):
+        """Draw random move, not AI based, on behalf of the computer.
+
+        rng: random.Random or None, the random number generator, e.g. a utility.RandomStream for
+             reproducible games, None uses the global random state
+        """
+        randrange = utility.random_stream(rng).randrange
         while True:
             choice = randrange(1, TicTacToe.__STRIKE ** 2)
             row, col = divmod(choice - 1, TicTacToe.__STRIKE) # map choice to square coordinates
@@ -1,8 +1,12 @@
 """Contains common utilities."""
 
 import abc
+import collections
 import collections.abc
+import hashlib
 import os
+import random
+import tempfile
 import weakref
 from copy import copy, deepcopy
 
@@ -267,6 +271,204 @@ class AdderWithRefCount(abc.ABC):
 
         return not stdout
 
+class LRUCache:
+    """A bounded cache that evicts the least recently used entry when it is full.
+
+    Hits, misses and evictions are counted so that the effectiveness of the cache can be reported.
+    """
+    MAXSIZE = 1024
+
+    def __init__(self, maxsize = MAXSIZE):
+        """ctor
+
+        maxsize: int, the maximum number of entries, 0 disables caching
+
+        exceptions: TypeError , if maxsize is not int
+                    ValueError, if maxsize < 0
+        """
+        if not isinstance(maxsize, int):
+            raise TypeError("error: 'maxsize' has to be of type 'int'")
+        if maxsize < 0:
+            raise ValueError("error: 'maxsize' has to be >= 0")
+
+        self.__maxsize = maxsize
+        self.__entries = collections.OrderedDict() # most recently used entries are last
+        self.__hits = 0
+        self.__misses = 0
+        self.__evictions = 0
+
+    def get(self, key, default = None):
+        """Get the value of a key and mark the key as the most recently used one.
+
+        key    : hashable, the key to look up
+        default: any, the value to return if key is not cached
+
+        return: any, the cached value or default
+        """
+        try:
+            value = self.__entries[key]
+        except KeyError:
+            self.__misses += 1
+            return default
+
+        self.__entries.move_to_end(key)
+        self.__hits += 1
+        return value
+
+    def put(self, key, value):
+        """Add or replace a key, evicting the least recently used key if the cache is full.
+
+        key  : hashable
+        value: any
+        """
+        if not self.__maxsize:
+            return
+
+        if key in self.__entries:
+            self.__entries.move_to_end(key)
+        elif len(self.__entries) == self.__maxsize:
+            self.__entries.popitem(last = False)
+            self.__evictions += 1
+        self.__entries[key] = value
+
+    def pop(self, key, default = None):
+        """Remove a key from the cache.
+
+        key    : hashable
+        default: any, the value to return if key is not cached
+
+        return: any, the removed value or default
+        """
+        return self.__entries.pop(key, default)
+
+    def clear(self):
+        """Remove all entries but keep the counters."""
+        self.__entries.clear()
+
+    @property
+    def maxsize(self):
+        """return: int, the maximum number of entries"""
+        return self.__maxsize
+
+    @property
+    def hits(self):
+        """return: int, the number of lookups that found their key"""
+        return self.__hits
+
+    @property
+    def misses(self):
+        """return: int, the number of lookups that did not find their key"""
+        return self.__misses
+
+    @property
+    def evictions(self):
+        """return: int, the number of entries evicted to make room for new ones"""
+        return self.__evictions
+
+    @property
+    def info(self):
+        """return: dict(str, int), the counters, the current size and the maximum size"""
+        return {'hits': self.__hits, 'misses': self.__misses, 'evictions': self.__evictions,
+                'size': len(self.__entries), 'maxsize': self.__maxsize}
+
+    def __len__(self):
+        """return: int, the number of cached entries"""
+        return len(self.__entries)
+
+    def __contains__(self, key):
+        """Check if a key is cached without counting a hit or a miss.
+
+        return: bool, True if key is cached
+        """
+        return key in self.__entries
+
+class RandomStream(random.Random):
+    """A seeded random number generator that spawns statistically independent child streams.
+
+    As with NumPy's SeedSequence, the seed of a stream is the hash of the entropy of the root stream
+    and of the spawn key, i.e. the indexes of the children that lead from the root stream to this
+    stream. A child stream is therefore the same in every process and does not depend on the order
+    in which streams are used. Work split into chunks, one child stream per chunk, gives the same
+    merged result whether the chunks run serially or in parallel.
+    """
+    def __init__(self, entropy = None, spawn_key = ()):
+        """ctor
+
+        entropy  : int or None, the master seed, if None it is read from os.urandom()
+        spawn_key: tuple of int, the child indexes from the root stream to this one
+
+        exceptions: TypeError, if a parameter is of the wrong type
+        """
+        if entropy is None:
+            entropy = int.from_bytes(os.urandom(16), 'big')
+        if not isinstance(entropy, int):
+            raise TypeError("error: 'entropy' has to be of type 'int'")
+        if not isinstance(spawn_key, tuple) or \
+           not all(isinstance(index, int) for index in spawn_key):
+            raise TypeError("error: 'spawn_key' has to be a tuple of 'int'")
+
+        self.__entropy = entropy
+        self.__spawn_key = spawn_key
+        self.__spawned = 0 # number of children spawned so far
+        super().__init__(self.__seed())
+
+    def spawn(self, num):
+        """Create independent child streams.
+
+        Every call creates new children, i.e. children are never spawned twice.
+
+        num: int, the number of child streams
+
+        return: list of RandomStream, the child streams
+        """
+        children = [RandomStream(self.__entropy, self.__spawn_key + (self.__spawned + i,))
+                    for i in range(num)]
+        self.__spawned += num
+
+        return children
+
+    @property
+    def entropy(self):
+        """return: int, the master seed"""
+        return self.__entropy
+
+    @property
+    def spawn_key(self):
+        """return: tuple of int, the child indexes from the root stream to this one"""
+        return self.__spawn_key
+
+    def __reduce__(self):
+        """Pickle the entropy, spawn key and state so that a copy continues the same stream."""
+        return self.__class__, (self.__entropy, self.__spawn_key), (self.getstate(),
+                                                                    self.__spawned)
+
+    def __setstate__(self, state):
+        """Restore the state saved by __reduce__()."""
+        self.setstate(state[0])
+        self.__spawned = state[1]
+
+    def __seed(self):
+        """return: int, the seed hashed from the entropy and spawn key"""
+        key = repr((self.__entropy, self.__spawn_key)).encode('utf-8')
+
+        return int.from_bytes(hashlib.sha256(key).digest(), 'big')
+
+def random_stream(rng):
+    """Get the random number generator a sampler should use.
+
+    rng: random.Random or None
+
+    return: random.Random or the random module, i.e. the global random state, if rng is None
+
+    exceptions: TypeError, if rng is not None or random.Random
+    """
+    if rng is None:
+        return random
+    if not isinstance(rng, random.Random):
+        raise TypeError("error: 'rng' has to be of type 'random.Random' or None")
+
+    return rng
+
 def get_filenames(filenames, old_filenames = None ):
     """Create a valid set of filenames based on an older set.
 
@@ -287,6 +489,27 @@ def get_filenames(filenames, old_filenames = None ):
 
     return filenames
 
+def atomic_write(filename, data):
+    """Write a file atomically.
+
+    The data is written to a temporary file in the directory of filename, flushed to disk and
+    renamed to filename, so after a crash the file is either the old or the new one.
+
+    filename: str
+    data    : bytes, the content of the file
+    """
+    directory, name = os.path.split(os.path.abspath(filename))
+    fd, temp_filename = tempfile.mkstemp(prefix = f".{name}.", suffix = '.tmp', dir = directory)
+    try:
+        with os.fdopen(fd, 'wb') as file:
+            file.write(data)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temp_filename, filename)
+    except BaseException:
+        os.remove(temp_filename)
+        raise
+
 def in_bisect(sorted_seq, val, pos = False, begin = -1, end = -1):
     """Search the sorted sequence to find a value.
 